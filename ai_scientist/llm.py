@@ -1,8 +1,9 @@
 import json
 import os
 import re
+import time
 from typing import Any
-from ai_scientist.utils.token_tracker import track_token_usage
+from ai_scientist.utils.token_tracker import token_tracker, track_token_usage
 
 import anthropic
 import backoff
@@ -192,12 +193,12 @@ def get_batch_responses_from_llm(
     return content, new_msg_history
 
 
-@track_token_usage
-def make_llm_call(client, model, temperature, system_message, prompt):
+def chat_completion_kwargs(model, temperature, system_message, prompt) -> dict[str, Any]:
+    """Chat completion request parameters for an OpenAI model, shared by direct and Batch API calls"""
     if "gpt-5" in model or "gpt-5-mini" in model:
         # GPT-5 and GPT-5-mini use max_completion_tokens instead of max_tokens
         # GPT-5 and GPT-5-mini only support temperature=1 (default)
-        return client.chat.completions.create(
+        return dict(
             model=model,
             messages=[
                 {"role": "system", "content": system_message},
@@ -210,7 +211,7 @@ def make_llm_call(client, model, temperature, system_message, prompt):
             seed=0,
         )
     elif "gpt" in model:
-        return client.chat.completions.create(
+        return dict(
             model=model,
             messages=[
                 {"role": "system", "content": system_message},
@@ -223,7 +224,7 @@ def make_llm_call(client, model, temperature, system_message, prompt):
             seed=0,
         )
     elif "o1" in model or "o3" in model:
-        return client.chat.completions.create(
+        return dict(
             model=model,
             messages=[
                 {"role": "user", "content": system_message},
@@ -238,6 +239,107 @@ def make_llm_call(client, model, temperature, system_message, prompt):
         raise ValueError(f"Model {model} not supported.")
 
 
+@track_token_usage
+def make_llm_call(client, model, temperature, system_message, prompt):
+    return client.chat.completions.create(
+        **chat_completion_kwargs(model, temperature, system_message, prompt)
+    )
+
+
+def batch_api_supported(client, model) -> bool:
+    """Whether requests for model can go through the OpenAI Batch API on this client"""
+    return (
+        isinstance(client, openai.OpenAI)
+        and client.base_url.host == "api.openai.com"
+        and ("gpt" in model or "o1" in model or "o3" in model)
+    )
+
+
+# Terminal states of an OpenAI batch job
+_BATCH_FINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+
+def get_responses_from_llm_batch(
+    msg_histories,
+    client,
+    model,
+    system_message,
+    temperature=0.7,
+    n_responses=1,
+    poll_interval=10,
+    max_wait=3600,
+) -> list[list[str] | None]:
+    """
+    Answer several independent conversations with a single OpenAI Batch API job.
+
+    Each history ends with the user message to answer and gets n_responses
+    sampled replies. Returns the replies to each history, or None where that
+    request failed. Raises RuntimeError if the job itself does not complete,
+    and TimeoutError (after cancelling the job) if it is still running after
+    max_wait seconds.
+    """
+    lines = []
+    for i, history in enumerate(msg_histories):
+        body = chat_completion_kwargs(model, temperature, system_message, history)
+        body["n"] = n_responses
+        lines.append(
+            json.dumps(
+                {
+                    "custom_id": str(i),
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": body,
+                }
+            )
+        )
+    batch_input = client.files.create(
+        file=("batch_input.jsonl", "\n".join(lines).encode("utf-8")), purpose="batch"
+    )
+    batch = client.batches.create(
+        input_file_id=batch_input.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h",
+    )
+    print(f"Submitted batch {batch.id} with {len(lines)} requests")
+    deadline = time.monotonic() + max_wait
+    while batch.status not in _BATCH_FINAL_STATUSES:
+        if time.monotonic() >= deadline:
+            client.batches.cancel(batch.id)
+            raise TimeoutError(f"Batch {batch.id} still {batch.status} after {max_wait}s, cancelled")
+        time.sleep(poll_interval)
+        batch = client.batches.retrieve(batch.id)
+    if batch.status != "completed" or not batch.output_file_id:
+        raise RuntimeError(f"Batch {batch.id} ended with status {batch.status}")
+
+    contents = [None] * len(msg_histories)
+    for line in client.files.content(batch.output_file_id).text.splitlines():
+        result = json.loads(line)
+        response = result.get("response") or {}
+        if response.get("status_code") != 200:
+            continue
+        body = response["body"]
+        i = int(result["custom_id"])
+        contents[i] = [choice["message"]["content"] for choice in body["choices"]]
+        # Batch requests bypass track_token_usage: record them the same way
+        usage = body.get("usage") or {}
+        token_tracker.add_tokens(
+            body.get("model", model),
+            usage.get("prompt_tokens", 0),
+            usage.get("completion_tokens", 0),
+            (usage.get("completion_tokens_details") or {}).get("reasoning_tokens", 0),
+            (usage.get("prompt_tokens_details") or {}).get("cached_tokens", 0),
+        )
+        for content in contents[i]:
+            token_tracker.add_interaction(
+                body.get("model", model),
+                system_message,
+                msg_histories[i][-1]["content"],
+                content,
+                body.get("created"),
+            )
+    return contents
+
+
 @backoff.on_exception(
     backoff.expo,
     (
@@ -1,5 +1,6 @@
 import argparse
 import json
+import logging
 import os
 import os.path as osp
 import re
@@ -12,12 +13,15 @@ import tempfile
 
 from ai_scientist.llm import (
     get_response_from_llm,
+    get_responses_from_llm_batch,
+    batch_api_supported,
     extract_json_between_markers,
     create_client,
     AVAILABLE_LLMS,
 )
 
 from ai_scientist.utils.token_tracker import track_token_usage
+from ai_scientist.utils.tex_env import existing_paths
 
 from ai_scientist.tools.semantic_scholar import search_for_papers
 
@@ -215,8 +219,9 @@ def compile_latex_original(cwd, pdf_file, timeout=30):
     ]
     
     current_path = env.get("PATH", "")
-    for latex_path in latex_paths:
-        if latex_path not in current_path and os.path.exists(latex_path):
+    # Which directories exist is probed once per process, not on every compile
+    for latex_path in existing_paths(tuple(latex_paths)):
+        if latex_path not in current_path:
             current_path = f"{latex_path}:{current_path}"
     env["PATH"] = current_path
 
@@ -513,12 +518,7 @@ def get_reflection_page_info(reflection_pdf, page_limit):
     return reflection_page_info
 
 
-def get_citation_addition(
-    client, model, context, current_round, total_rounds, idea_text
-):
-    report, citations = context
-    msg_history = []
-    citation_system_msg_template = """You are an ambitious AI researcher who is looking to publish a paper to a workshop at ICLR 2025 that explores real-world pitfalls, failures, and challenges in deep learning.
+citation_system_msg_template = """You are an ambitious AI researcher who is looking to publish a paper to a workshop at ICLR 2025 that explores real-world pitfalls, failures, and challenges in deep learning.
 You have already completed the experiments and now you are looking to collect citations to related papers.
 This phase focuses on collecting references and annotating them to be integrated later.
 Collected citations will be added to a references.bib file.
@@ -541,7 +541,7 @@ You will have {total_rounds} rounds to add to the references but do not need to
 
 DO NOT ADD A CITATION THAT ALREADY EXISTS!"""
 
-    citation_first_prompt_template = """Round {current_round}/{total_rounds}:
+citation_first_prompt_template = """Round {current_round}/{total_rounds}:
 
 You planned and executed the following idea:
 ```markdown
@@ -579,7 +579,7 @@ In <JSON>, respond in JSON format with the following fields:
 - "Query": The search query to find the paper (e.g., attention is all you need).
 This JSON will be automatically parsed, so ensure the format is precise."""
 
-    citation_second_prompt_template = """Search has recovered the following articles:
+citation_second_prompt_template = """Search has recovered the following articles:
 
 {papers}
 
@@ -602,6 +602,77 @@ In <JSON>, respond in JSON format with the following fields:
 - "Description": Update the previous description of the citation(s) with the additional context. This should be a brief description of the work(s), their relevance, and where in a paper these should be cited.
 This JSON will be automatically parsed, so ensure the format is precise."""
 
+
+def _plan_citation_search(text):
+    """Query to search for from a first-round reply, or None once no more citations are needed"""
+    if "No more citations needed" in text:
+        return None
+    json_output = extract_json_between_markers(text)
+    assert json_output is not None, "Failed to extract JSON from LLM output"
+    return json_output["Query"]
+
+
+def _format_papers(papers):
+    paper_strings = []
+    for i, paper in enumerate(papers):
+        paper_strings.append(
+            "{i}: {title}. {authors}. {venue}, {year}.\nAbstract: {abstract}".format(
+                i=i,
+                title=paper["title"],
+                authors=paper["authors"],
+                venue=paper["venue"],
+                year=paper["year"],
+                abstract=paper["abstract"],
+            )
+        )
+    return "\n\n".join(paper_strings)
+
+
+def _selected_citations(text, papers):
+    """Annotated BibTeX entries for the papers a second-round reply selected, or None"""
+    if "Do not add any" in text:
+        print("Do not add any.")
+        return None
+
+    json_output = extract_json_between_markers(text)
+    assert json_output is not None, "Failed to extract JSON from LLM output"
+    desc = json_output["Description"]
+    selected_papers = str(json_output["Selected"])
+
+    if selected_papers == "[]":
+        return None
+    selected_indices = []
+    for x in selected_papers.strip("[]").split(","):
+        x_str = x.strip().strip('"').strip("'")
+        if x_str:
+            selected_indices.append(int(x_str))
+    assert all(
+        [0 <= i < len(papers) for i in selected_indices]
+    ), "Invalid paper index"
+    bibtexs = [papers[i]["citationStyles"]["bibtex"] for i in selected_indices]
+
+    cleaned_bibtexs = []
+    for bibtex in bibtexs:
+        newline_index = bibtex.find("\n")
+        cite_key_line = bibtex[:newline_index]
+        cite_key_line = remove_accents_and_clean(cite_key_line)
+        cleaned_bibtexs.append(cite_key_line + bibtex[newline_index:])
+    bibtexs = cleaned_bibtexs
+
+    bibtex_string = "\n".join(bibtexs)
+
+    references_format = """% {description}
+{bibtex}"""
+
+    return references_format.format(bibtex=bibtex_string, description=desc)
+
+
+def get_citation_addition(
+    client, model, context, current_round, total_rounds, idea_text
+):
+    report, citations = context
+    msg_history = []
+
     try:
         text, msg_history = get_response_from_llm(
             prompt=citation_first_prompt_template.format(
@@ -619,13 +690,11 @@ This JSON will be automatically parsed, so ensure the format is precise."""
             msg_history=msg_history,
             print_debug=False,
         )
-        if "No more citations needed" in text:
+        query = _plan_citation_search(text)
+        if query is None:
             print("No more citations needed.")
             return None, True
 
-        json_output = extract_json_between_markers(text)
-        assert json_output is not None, "Failed to extract JSON from LLM output"
-        query = json_output["Query"]
         papers = search_for_papers(query, result_limit=5)
     except Exception:
         print("EXCEPTION in get_citation_addition (initial search):")
@@ -636,19 +705,7 @@ This JSON will be automatically parsed, so ensure the format is precise."""
         print("No papers found.")
         return None, False
 
-    paper_strings = []
-    for i, paper in enumerate(papers):
-        paper_strings.append(
-            "{i}: {title}. {authors}. {venue}, {year}.\nAbstract: {abstract}".format(
-                i=i,
-                title=paper["title"],
-                authors=paper["authors"],
-                venue=paper["venue"],
-                year=paper["year"],
-                abstract=paper["abstract"],
-            )
-        )
-    papers_str = "\n\n".join(paper_strings)
+    papers_str = _format_papers(papers)
 
     try:
         text, msg_history = get_response_from_llm(
@@ -665,47 +722,13 @@ This JSON will be automatically parsed, so ensure the format is precise."""
             msg_history=msg_history,
             print_debug=False,
         )
-        if "Do not add any" in text:
-            print("Do not add any.")
-            return None, False
-
-        json_output = extract_json_between_markers(text)
-        assert json_output is not None, "Failed to extract JSON from LLM output"
-        desc = json_output["Description"]
-        selected_papers = str(json_output["Selected"])
-
-        if selected_papers != "[]":
-            selected_indices = []
-            for x in selected_papers.strip("[]").split(","):
-                x_str = x.strip().strip('"').strip("'")
-                if x_str:
-                    selected_indices.append(int(x_str))
-            assert all(
-                [0 <= i < len(papers) for i in selected_indices]
-            ), "Invalid paper index"
-            bibtexs = [papers[i]["citationStyles"]["bibtex"] for i in selected_indices]
-
-            cleaned_bibtexs = []
-            for bibtex in bibtexs:
-                newline_index = bibtex.find("\n")
-                cite_key_line = bibtex[:newline_index]
-                cite_key_line = remove_accents_and_clean(cite_key_line)
-                cleaned_bibtexs.append(cite_key_line + bibtex[newline_index:])
-            bibtexs = cleaned_bibtexs
-
-            bibtex_string = "\n".join(bibtexs)
-        else:
-            return None, False
+        references_prompt = _selected_citations(text, papers)
 
     except Exception:
         print("EXCEPTION in get_citation_addition (selecting papers):")
         print(traceback.format_exc())
         return None, False
 
-    references_format = """% {description}
-{bibtex}"""
-
-    references_prompt = references_format.format(bibtex=bibtex_string, description=desc)
     return references_prompt, False
 
 
@@ -1033,6 +1056,136 @@ def gather_citations(base_folder, num_cite_rounds=20, small_model="gpt-4o-2024-0
         return citations_text if citations_text else None
 
 
+def gather_citations_batched(base_folder, num_cite_rounds=20, small_model="gpt-4o-2024-05-13"):
+    """
+    Gather citations through the OpenAI Batch API instead of round by round.
+
+    One batch request samples the search for every round and a second batch
+    screens all the search results, so num_cite_rounds rounds cost two batch
+    jobs. Either job is cancelled if it runs past its deadline. The rounds
+    cannot see each other's picks, so repeated queries and papers are dropped
+    when merging. Falls back to gather_citations when the model has no Batch
+    API, when earlier progress should be resumed, or when a batch fails or
+    times out.
+
+    Args:
+        base_folder: Path to project folder
+        num_cite_rounds: Number of citation searches to plan
+        small_model: Model to use for citation collection
+
+    Returns:
+        str: The gathered citations text, or None if failed
+    """
+    citations_cache_path = osp.join(base_folder, "cached_citations.bib")
+    progress_path = osp.join(base_folder, "citations_progress.json")
+
+    def sequential():
+        return gather_citations(base_folder, num_cite_rounds=num_cite_rounds, small_model=small_model)
+
+    # Resuming is round-based: leave it to the sequential path
+    if osp.exists(progress_path):
+        return sequential()
+
+    client, client_model = create_client(small_model)
+    if not batch_api_supported(client, client_model):
+        print(f"Batch API not available for {client_model}, gathering citations sequentially")
+        return sequential()
+
+    try:
+        idea_text = load_idea_text(base_folder)
+        exp_summaries = load_exp_summaries(base_folder)
+        filtered_summaries = filter_experiment_summaries(
+            exp_summaries, step_name="citation_gathering"
+        )
+        filtered_summaries_str = json.dumps(filtered_summaries, indent=2)
+        system_message = citation_system_msg_template.format(total_rounds=num_cite_rounds)
+
+        # Batch 1: the rounds share one prompt (no citations picked yet), so a single
+        # request samples every round's search query
+        first_history = [
+            {
+                "role": "user",
+                "content": citation_first_prompt_template.format(
+                    current_round=1,
+                    total_rounds=num_cite_rounds,
+                    Idea=idea_text,
+                    report=filtered_summaries_str,
+                    citations="",
+                ),
+            }
+        ]
+        first_replies = get_responses_from_llm_batch(
+            [first_history], client, client_model, system_message, n_responses=num_cite_rounds
+        )[0]
+        if first_replies is None:
+            raise RuntimeError("The batch request planning the citation searches failed")
+
+        # Search once per distinct query
+        second_histories, searched_papers, seen_queries = [], [], set()
+        for text in first_replies:
+            try:
+                query = _plan_citation_search(text)
+            except Exception:
+                print("EXCEPTION in gather_citations_batched (planning search):")
+                print(traceback.format_exc())
+                continue
+            if query is None or query.lower() in seen_queries:
+                continue
+            seen_queries.add(query.lower())
+            papers = search_for_papers(query, result_limit=5)
+            if papers is None:
+                continue
+            second_histories.append(
+                first_history
+                + [
+                    {"role": "assistant", "content": text},
+                    {
+                        "role": "user",
+                        "content": citation_second_prompt_template.format(
+                            papers=_format_papers(papers)
+                        ),
+                    },
+                ]
+            )
+            searched_papers.append(papers)
+
+        # Batch 2: pick the papers to cite from each search
+        second_replies = get_responses_from_llm_batch(
+            second_histories, client, client_model, system_message
+        ) if second_histories else []
+    except Exception:
+        print("EXCEPTION in gather_citations_batched, gathering citations sequentially:")
+        print(traceback.format_exc())
+        return sequential()
+
+    citations_text = ""
+    for replies, papers in zip(second_replies, searched_papers):
+        if replies is None:
+            continue
+        text = replies[0]
+        try:
+            addition = _selected_citations(text, papers)
+        except Exception:
+            print("EXCEPTION in gather_citations_batched (selecting papers):")
+            print(traceback.format_exc())
+            continue
+        if addition is None:
+            continue
+        # Same duplicate-title check as the sequential rounds
+        title_match = re.search(r" title = {(.*?)}", addition)
+        if title_match:
+            existing_titles = [t.lower() for t in re.findall(r" title = {(.*?)}", citations_text)]
+            if title_match.group(1).lower() not in existing_titles:
+                citations_text += "\n" + addition
+
+    with open(citations_cache_path, "w") as f:
+        f.write(citations_text)
+    with open(progress_path, "w") as f:
+        json.dump({"completed_rounds": num_cite_rounds, "status": "completed"}, f)
+
+    return citations_text if citations_text else None
+
+
 def perform_writeup(
     base_folder,
     citations_text=None,
@@ -1602,6 +1755,9 @@ if __name__ == "__main__":
         help="Target page limit for the main paper (excluding references).",
     )
     args = parser.parse_args()
+    # LaTeXPackageManager reports its progress at INFO
+    logging.basicConfig(format="%(message)s", stream=sys.stdout)
+    logging.getLogger("ai_scientist.utils.latex_helper").setLevel(logging.INFO)
 
     try:
         success = perform_writeup(
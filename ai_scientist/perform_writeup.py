@@ -1,10 +1,12 @@
 import argparse
 import json
+import logging
 import os
 import os.path as osp
 import re
 import shutil
 import subprocess
+import sys
 import traceback
 import unicodedata
 import uuid
@@ -945,6 +947,9 @@ if __name__ == "__main__":
         help="Target page limit for the main paper (excluding references, impact statement, etc.)",
     )
     args = parser.parse_args()
+    # LaTeXPackageManager reports its progress at INFO
+    logging.basicConfig(format="%(message)s", stream=sys.stdout)
+    logging.getLogger("ai_scientist.utils.latex_helper").setLevel(logging.INFO)
 
     try:
         success = perform_writeup(
@@ -50,7 +50,7 @@ def edit_bfts_config_file(config_path: str, idea_dir: str, idea_path: str, gpu_i
         config_path: Path to the bfts_config.yaml file
         idea_dir: Directory where the idea.md file is located
         idea_path: Path to the idea.md file
-        gpu_info: Dictionary containing GPU information (available_gpus, force_cpu)
+        gpu_info: Dictionary containing GPU information (available_gpus, force_cpu, mps_percent)
 
     Returns:
         Path to the edited bfts_config.yaml file
@@ -83,6 +83,9 @@ def edit_bfts_config_file(config_path: str, idea_dir: str, idea_path: str, gpu_i
                 original_workers = config["agent"].get("num_workers", 4)
                 config["agent"]["num_workers"] = min(original_workers, num_gpus)
                 print(f"🎮 Adjusted num_workers to {config['agent']['num_workers']} to match {num_gpus} available GPUs")
+            mps_percent = gpu_info.get("mps_percent")
+            if mps_percent is not None:
+                print(f"🎮 Each GPU is shared through MPS: this run gets {mps_percent}% of its SMs")
         elif force_cpu:
             print("🖥️  Force CPU mode - using default num_workers configuration")
         else:
@@ -4,13 +4,21 @@ LaTeX Package Manager for AI Scientist
 Automatically detects and installs missing LaTeX packages during compilation
 """
 
+import atexit
+import hashlib
+import mmap
 import os
 import re
+import select
 import subprocess
 import sys
-from typing import List, Set, Optional, Tuple, Dict
+import threading
+import time
+from contextlib import contextmanager
+from typing import List, Set, Optional, Tuple, Dict, Iterator, Union
 import logging
 import shutil # Added for backup
+from concurrent.futures import ThreadPoolExecutor
 
 # Import template validator
 try:
@@ -21,6 +29,278 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Common LaTeX installation paths searched when a binary is not on PATH
+LATEX_PATHS = [
+    "/Users/lirenw/Library/TinyTeX/bin/universal-darwin",
+    "/usr/local/texlive/2023/bin/universal-darwin",
+    "/usr/local/texlive/2024/bin/universal-darwin",
+    "/usr/local/texlive/2025/bin/universal-darwin",
+    "/usr/local/bin",
+    "/opt/homebrew/bin"
+]
+
+# tlmgr report for a package missing from the repository
+_TLMGR_NOT_PRESENT_RE = re.compile(r"package (\S+) not present in repository", re.IGNORECASE)
+
+# tlmgr report when another tlmgr process holds the installation lock
+_TLMGR_LOCK_RE = re.compile(r"(?:cannot|could not|unable to) (?:obtain|get|acquire)[^\n]*\block\b", re.IGNORECASE)
+
+# Common LaTeX errors reported when no missing package explains a failure (in priority order)
+COMMON_LATEX_ERRORS = [
+    "Undefined control sequence",
+    "Missing $ inserted",
+    "Extra alignment tab",
+    "Illegal parameter number",
+    "File ended while scanning",
+    "Emergency stop",
+    "Fatal error occurred"
+]
+
+# Packages assumed to ship with every LaTeX distribution (lowercase)
+_STANDARD_PACKAGES = frozenset({
+    'amsmath', 'amssymb', 'amsfonts', 'graphicx', 'xcolor', 'color',
+    'booktabs', 'array', 'multirow', 'natbib', 'hyperref', 'geometry',
+    'fancyhdr', 'titlesec', 'caption', 'subcaption', 'float', 'placeins',
+    'afterpage', 'times', 'helvet', 'courier', 'palatino', 'mathpazo',
+    'txfonts', 'pxfonts', 'lmodern', 'fourier', 'kpfonts', 'libertine'
+})
+
+# Write buffer for rewritten source files (1 MiB)
+IO_BUFSIZE = 1 << 20
+
+# Compiled PDFs keyed by a digest of their inputs, reused when nothing changed
+LATEX_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "ai_scientist", "latex")
+# Bounds on the PDF cache: least recently used builds go first, stale ones always
+LATEX_CACHE_MAX_BYTES = 512 * 1024 * 1024
+LATEX_CACHE_MAX_AGE_SECONDS = 30 * 24 * 3600
+
+# Extensions pdflatex tries, in order, for an \includegraphics path given without one
+_GRAPHICS_EXTENSIONS = ('.pdf', '.PDF', '.ai', '.AI', '.png', '.PNG', '.jpg', '.JPG',
+                        '.jpeg', '.JPEG', '.jbig2', '.JBIG2', '.jb2', '.JB2', '.eps')
+
+# Missing-file errors and the emergency stop sit at the end of the log; only its tail is scanned
+LOG_SCAN_TAIL_CHARS = 64 * 1024
+
+# Single-pass compilation log scanner; the named group that matched identifies the finding:
+#   missing:    ! LaTeX Error: File `package.sty' not found. (also .cls)
+#   cant_find:  ! I can't find file `package.sty'.
+#   usepackage: l.12 \usepackage{package} (the failing line before an emergency stop)
+#   error:      one of COMMON_LATEX_ERRORS
+_LOG_SCANNER = re.compile(
+    r"(?i:File `(?P<missing>[^'`]+)\.(?:sty|cls)' not found"
+    r"|! I can't find file `(?P<cant_find>[^'`]+)\.sty'"
+    r"|l\.\d+\s+\\usepackage\s*\{(?P<usepackage>[^}]+)\})"
+    r"|(?P<error>" + "|".join(re.escape(error) for error in COMMON_LATEX_ERRORS) + r")"
+)
+
+# LaTeX source scanner: every command validate_latex_file inspects, matched in one pass.
+# Source and .bib patterns are bytes so they run directly over memory-mapped files.
+_TEX_SCANNER = re.compile(
+    rb'\\(?P<cmd>includegraphics\*?|usepackage|documentclass|ref|eqref|pageref|label'
+    rb'|cite[pt]?|citealp|citealt|bibliography)(?:\[[^\]]*\])?\{(?P<arg>[^}]+)\}'
+)
+_FILECONTENTS_BIB_RE = re.compile(rb'\\begin\{filecontents\}\{[^}]*\.bib\}(.*?)\\end\{filecontents\}', re.DOTALL)
+
+# Unescaped special characters in .bbl files: not preceded by a backslash,
+# & not followed by another &, and _ # % not followed by {
+_BBL_ESCAPE_RE = re.compile(r'(?<!\\)(?:&(?!&)|[_#%](?!\{))')
+_BBL_ESCAPE_DESCRIPTIONS = [
+    ('&', 'ampersands'),
+    ('_', 'underscores'),
+    ('#', 'hash symbols'),
+    ('%', 'percent symbols'),
+]
+
+# HTML entities that shouldn't be in BibTeX, and their replacements
+_HTML_ENTITIES = {
+    '&amp;': '\\&',
+    '&lt;': '<',
+    '&gt;': '>',
+    '&quot;': '"',
+    '&#39;': "'"
+}
+_HTML_ENTITY_RE = re.compile('|'.join(re.escape(entity) for entity in _HTML_ENTITIES))
+
+# Unescaped ampersands in .bib files: inside field values, then anywhere else.
+# HTML entities are left for _HTML_ENTITY_RE; the general pattern is zero-width
+# around the '&' so adjacent matches such as 'A&B&C' are all found in one pass
+_NOT_HTML_ENTITY = '(?!%s)' % '|'.join(re.escape(entity[1:]) for entity in _HTML_ENTITIES)
+_BIB_FIELD_AMP_RE = re.compile(r'(\s*=\s*\{[^}]*[^\\])&' + _NOT_HTML_ENTITY + r'([^}]*\})')
+_BIB_GEN_AMP_RE = re.compile(r'(?<!\\)&' + _NOT_HTML_ENTITY + r'(?![&\s])')
+
+# BibTeX-related errors in a LaTeX log
+_BIBTEX_ERROR_PATTERNS = [
+    (r'! Misplaced alignment tab character &', 'Unescaped ampersand in bibliography'),
+    (r'! Undefined control sequence.*\\&', 'Malformed ampersand escape'),
+    (r'! LaTeX Error: Something\'s wrong--perhaps a missing \\item', 'Bibliography formatting error'),
+    (r'Package natbib Warning: Citation .* undefined', 'Undefined citations'),
+    (r'! Package natbib Error:', 'NatBib package error'),
+    (r'! I can\'t find file.*\.bbl', 'Missing bibliography file'),
+]
+# All of the above in one alternation, so the log is scanned once; group pN is pattern N
+_BIBTEX_LOG_RE = re.compile(
+    '|'.join(f'(?P<p{i}>{pattern})' for i, (pattern, _) in enumerate(_BIBTEX_ERROR_PATTERNS)),
+    re.IGNORECASE
+)
+
+# Files a build depends on besides the .tex itself
+_DEPENDENCY_RE = re.compile(
+    rb'\\(?P<cmd>input|include|includegraphics\*?|bibliography)(?:\[[^\]]*\])?\{(?P<arg>[^}]+)\}'
+)
+
+# BibTeX entry keys: @article{key,
+_BIB_KEY_RE = re.compile(rb'@[^{]*\{([^,]+),')
+
+# Shell script written by create_package_install_script
+_INSTALL_SCRIPT = """#!/bin/bash
+# LaTeX Package Installation Script for AI Scientist
+# Run this script to install essential packages for scientific paper generation
+
+echo "🚀 Installing essential LaTeX packages for AI Scientist..."
+
+# Check if tlmgr is available
+if ! command -v tlmgr &> /dev/null; then
+    echo "❌ tlmgr not found. Please install TinyTeX first:"
+    echo "   R: tinytex::install_tinytex()"
+    echo "   Or visit: https://yihui.org/tinytex/"
+    exit 1
+fi
+
+# Essential packages for scientific papers
+PACKAGES=(
+    "siunitx" "multirow" "algorithm2e" "algorithms"
+    "amsmath" "amsfonts" "amssymb" "amsthm" "mathtools"
+    "graphicx" "subfigure" "booktabs" "array"
+    "hyperref" "url" "natbib" "cite"
+    "xcolor" "tikz" "pgfplots" "listings"
+    "geometry" "fancyhdr" "setspace" "enumitem"
+    "caption" "float" "placeins"
+)
+
+success_count=0
+total_count=${#PACKAGES[@]}
+
+for package in "${PACKAGES[@]}"; do
+    echo "📦 Installing $package..."
+    if tlmgr install "$package" 2>/dev/null; then
+        echo "✅ $package installed successfully"
+        ((success_count++))
+    else
+        echo "⚠️  $package installation failed (may already be installed)"
+    fi
+done
+
+echo "🎉 Installation complete: $success_count/$total_count packages processed"
+echo "✅ LaTeX environment ready for AI Scientist!"
+"""
+_INSTALL_SCRIPT_BYTES = _INSTALL_SCRIPT.encode('utf-8')
+
+def _stat_signature(path: str) -> Tuple[int, int]:
+    """(mtime_ns, size) of a path, or (-1, -1) if it does not exist"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return (-1, -1)
+    return (st.st_mtime_ns, st.st_size)
+
+@contextmanager
+def _map_file(path: str) -> Iterator[Union[mmap.mmap, bytes]]:
+    """Map a file read-only for regex scanning without copying it into a string"""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b''  # empty files cannot be mapped
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+
+def _atomic_write(path: str, content: str, backup_path: Optional[str] = None) -> None:
+    """Replace a text file's content via a temporary file so readers never see a partial write.
+    With backup_path, the original is kept there once the new content is safely on disk."""
+    tmp_path = path + '.tmp'
+    try:
+        with open(tmp_path, 'w', encoding='utf-8', buffering=IO_BUFSIZE) as f:
+            f.write(content)
+        if os.path.exists(path):
+            shutil.copymode(path, tmp_path)
+            if backup_path is not None:
+                _backup_file(path, backup_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def _backup_file(path: str, backup_path: str) -> None:
+    """Keep the current bytes of path at backup_path, as a hard link when the filesystem allows it"""
+    if os.path.lexists(backup_path):
+        os.remove(backup_path)
+    try:
+        # The link keeps the original inode alive once path is atomically replaced
+        os.link(path, backup_path)
+    except (OSError, AttributeError):
+        shutil.copy2(path, backup_path)
+
+def _file_digest(path: str) -> Optional[bytes]:
+    """SHA-256 digest of a file's contents, or None if it cannot be read"""
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha256(f.read()).digest()
+    except OSError:
+        return None
+
+def _prune_pdf_cache() -> None:
+    """Drop cached builds older than LATEX_CACHE_MAX_AGE_SECONDS, then the least recently
+    used ones until the cache fits in LATEX_CACHE_MAX_BYTES (best effort)"""
+    builds = {}  # cache key -> [last use, total size, paths]
+    try:
+        with os.scandir(LATEX_CACHE_DIR) as entries:
+            for entry in entries:
+                key = entry.name.split('.', 1)[0]
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                build = builds.setdefault(key, [0.0, 0, []])
+                build[0] = max(build[0], st.st_mtime)
+                build[1] += st.st_size
+                build[2].append(entry.path)
+    except OSError:
+        return
+    
+    oldest_allowed = time.time() - LATEX_CACHE_MAX_AGE_SECONDS
+    total = sum(build[1] for build in builds.values())
+    for last_use, size, paths in sorted(builds.values()):
+        if last_use >= oldest_allowed and total <= LATEX_CACHE_MAX_BYTES:
+            break
+        for path in paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        total -= size
+
+def _path_exists(listings: Dict[str, Set[str]], path: str) -> bool:
+    """Check existence via a per-directory listing, scanning each directory at most once"""
+    # No normpath: collapsing '..' textually would bypass symlinked directories
+    directory, name = os.path.split(path)
+    directory = directory or os.curdir
+    names = listings.get(directory)
+    if names is None:
+        try:
+            with os.scandir(directory) as entries:
+                names = {entry.name for entry in entries}
+        except OSError:
+            names = set()
+        listings[directory] = names
+    # A listing miss may still exist on a case-insensitive filesystem (APFS, NTFS):
+    # let the filesystem decide before calling the file missing
+    return name in names or os.path.exists(path)
+
+def _find_bib_files(directory: str) -> List[str]:
+    """Paths of the .bib files in a directory, using the file type cached by os.scandir"""
+    with os.scandir(directory) as entries:
+        return [entry.path for entry in entries if entry.name.endswith('.bib') and entry.is_file()]
+
 class LaTeXPackageManager:
     """Manages LaTeX package installation and compilation with validation"""
     
@@ -47,120 +327,226 @@ class LaTeXPackageManager:
         'tikz': 'pgf',
     }
     
+    # Resolved LaTeX binaries shared across instances: (name, PATH) -> absolute path
+    _TOOL_CACHE: Dict[Tuple[str, str], Optional[str]] = {}
+    
+    # Long-running `tlmgr shell` reused by every install, avoiding a TLPDB load per package
+    _tlmgr_shell: Optional[subprocess.Popen] = None
+    _tlmgr_shell_lock = threading.Lock()
+    _tlmgr_shell_atexit = False
+    # Template structure validator shared by every instance; it keeps per-call state, so
+    # calls are serialized. Results of checks that left the file untouched are kept per
+    # (path, mtime_ns, size) so an unchanged file is not re-checked.
+    _template_validator: Optional['LaTeXTemplateValidator'] = None
+    _template_validator_lock = threading.Lock()
+    _template_results: Dict[Tuple[str, int, int], Dict] = {}
+    
     def __init__(self):
-        self.installed_packages: Set[str] = set()
-        self.failed_packages: Set[str] = set()
+        # Install outcome per LaTeX package name: 'installed' or 'failed' (absent = not tried)
+        self._pkg_state: Dict[str, str] = {}
         self.logger = logging.getLogger(__name__)
+        # validate_latex_file results: (path, mtime_ns, size) -> (dependency signatures, issues)
+        self._validate_cache: Dict[Tuple[str, int, int], Tuple[Dict[str, Tuple[int, int]], Dict[str, List[str]]]] = {}
+        # Citation keys per .bib file: (path, mtime_ns, size) -> keys
+        self._bib_cache: Dict[Tuple[str, int, int], Set[str]] = {}
+        # Whether a directory holds .bbl/.bib files: (path, mtime_ns) -> bool
+        self._has_bib_cache: Dict[Tuple[str, int], bool] = {}
+
+    @property
+    def installed_packages(self) -> Set[str]:
+        """Packages installed successfully during this session"""
+        return {package for package, state in self._pkg_state.items() if state == 'installed'}
+
+    @property
+    def failed_packages(self) -> Set[str]:
+        """Packages whose installation failed during this session"""
+        return {package for package, state in self._pkg_state.items() if state == 'failed'}
+
+    @classmethod
+    def _resolve_tool(cls, name: str) -> Optional[str]:
+        """Resolve the absolute path of a working LaTeX binary (cached per PATH)"""
+        key = (name, os.environ.get("PATH", ""))
+        if key in cls._TOOL_CACHE:
+            return cls._TOOL_CACHE[key]
+        
+        # Current PATH first, then the common installation directories
+        candidates = []
+        which_path = shutil.which(name)
+        if which_path:
+            candidates.append(which_path)
+        for latex_path in LATEX_PATHS:
+            candidate = os.path.join(latex_path, name)
+            if os.path.isfile(candidate) and os.access(candidate, os.X_OK):
+                candidates.append(candidate)
+        
+        resolved = None
+        for candidate in candidates:
+            try:
+                result = subprocess.run([candidate, '--version'],
+                                      capture_output=True, text=True, timeout=10)
+                if result.returncode == 0:
+                    resolved = candidate
+                    break
+            except (subprocess.SubprocessError, FileNotFoundError, OSError):
+                continue
+        
+        cls._TOOL_CACHE[key] = resolved
+        if resolved is not None:
+            # Update PATH for this session so child processes find the toolchain
+            latex_path = os.path.dirname(resolved)
+            current_path = os.environ.get("PATH", "")
+            if latex_path not in current_path.split(os.pathsep):
+                os.environ["PATH"] = f"{latex_path}{os.pathsep}{current_path}"
+                logger.info(f"🔧 Added {latex_path} to PATH")
+                cls._TOOL_CACHE[(name, os.environ["PATH"])] = resolved
+        return resolved
 
     def check_latex_installation(self) -> bool:
         """Check if LaTeX is properly installed"""
-        # Common LaTeX installation paths
-        latex_paths = [
-            "/Users/lirenw/Library/TinyTeX/bin/universal-darwin",
-            "/usr/local/texlive/2023/bin/universal-darwin",
-            "/usr/local/texlive/2024/bin/universal-darwin", 
-            "/usr/local/texlive/2025/bin/universal-darwin",
-            "/usr/local/bin",
-            "/opt/homebrew/bin"
-        ]
-        
-        # First try with current PATH
-        try:
-            result = subprocess.run(['pdflatex', '--version'], 
-                                  capture_output=True, text=True, timeout=10)
-            if result.returncode == 0:
-                print(f"✅ pdflatex found: {result.stdout.split()[0]} {result.stdout.split()[1]}")
-                return True
-        except (subprocess.SubprocessError, FileNotFoundError, subprocess.TimeoutExpired):
-            pass
-        
-        # Try with extended PATH
-        for latex_path in latex_paths:
-            if os.path.exists(latex_path):
-                pdflatex_path = os.path.join(latex_path, 'pdflatex')
-                if os.path.exists(pdflatex_path):
-                    try:
-                        result = subprocess.run([pdflatex_path, '--version'], 
-                                              capture_output=True, text=True, timeout=10)
-                        if result.returncode == 0:
-                            print(f"✅ pdflatex found at: {pdflatex_path}")
-                            # Update PATH for this session
-                            current_path = os.environ.get("PATH", "")
-                            if latex_path not in current_path:
-                                os.environ["PATH"] = f"{latex_path}:{current_path}"
-                                print(f"🔧 Added {latex_path} to PATH")
-                            return True
-                    except (subprocess.SubprocessError, FileNotFoundError, subprocess.TimeoutExpired):
-                        continue
-        
-        print("❌ pdflatex not found or not working")
-        return False
+        pdflatex_path = self._resolve_tool('pdflatex')
+        if pdflatex_path is None:
+            self.logger.error("❌ pdflatex not found or not working")
+            return False
+        self.logger.info(f"✅ pdflatex found at: {pdflatex_path}")
+        return True
     
     def check_tlmgr_installation(self) -> bool:
         """Check if tlmgr (TinyTeX package manager) is available"""
-        # Common LaTeX installation paths
-        latex_paths = [
-            "/Users/lirenw/Library/TinyTeX/bin/universal-darwin",
-            "/usr/local/texlive/2023/bin/universal-darwin",
-            "/usr/local/texlive/2024/bin/universal-darwin", 
-            "/usr/local/texlive/2025/bin/universal-darwin",
-            "/usr/local/bin",
-            "/opt/homebrew/bin"
-        ]
-        
-        # First try with current PATH
-        try:
-            result = subprocess.run(['tlmgr', '--version'], 
-                                  capture_output=True, text=True, timeout=10)
-            if result.returncode == 0:
-                print(f"✅ tlmgr found")
-                return True
-        except (subprocess.SubprocessError, FileNotFoundError, subprocess.TimeoutExpired):
-            pass
-        
-        # Try with extended PATH
-        for latex_path in latex_paths:
-            if os.path.exists(latex_path):
-                tlmgr_path = os.path.join(latex_path, 'tlmgr')
-                if os.path.exists(tlmgr_path):
-                    try:
-                        result = subprocess.run([tlmgr_path, '--version'], 
-                                              capture_output=True, text=True, timeout=10)
-                        if result.returncode == 0:
-                            print(f"✅ tlmgr found at: {tlmgr_path}")
-                            # Update PATH for this session
-                            current_path = os.environ.get("PATH", "")
-                            if latex_path not in current_path:
-                                os.environ["PATH"] = f"{latex_path}:{current_path}"
-                                print(f"🔧 Added {latex_path} to PATH")
-                            return True
-                    except (subprocess.SubprocessError, FileNotFoundError, subprocess.TimeoutExpired):
-                        continue
-        
-        print("❌ tlmgr not found - automatic package installation unavailable")
-        return False
+        tlmgr_path = self._resolve_tool('tlmgr')
+        if tlmgr_path is None:
+            self.logger.error("❌ tlmgr not found - automatic package installation unavailable")
+            return False
+        self.logger.info(f"✅ tlmgr found at: {tlmgr_path}")
+        return True
     
+    @classmethod
+    def _get_tlmgr_shell(cls) -> Optional[subprocess.Popen]:
+        """Return the shared `tlmgr shell` process, starting it on first use"""
+        if cls._tlmgr_shell is not None and cls._tlmgr_shell.poll() is None:
+            return cls._tlmgr_shell
+        tlmgr = cls._resolve_tool('tlmgr')
+        if tlmgr is None:
+            return None
+        try:
+            cls._tlmgr_shell = subprocess.Popen(
+                [tlmgr, '--machine-readable', 'shell'],
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, bufsize=0
+            )
+        except OSError:
+            cls._tlmgr_shell = None
+            return None
+        if not cls._tlmgr_shell_atexit:
+            atexit.register(cls._close_tlmgr_shell)
+            cls._tlmgr_shell_atexit = True
+        return cls._tlmgr_shell
+
+    @classmethod
+    def _close_tlmgr_shell(cls) -> None:
+        """Ask the shared tlmgr shell to quit, killing it if it does not"""
+        proc, cls._tlmgr_shell = cls._tlmgr_shell, None
+        if proc is None or proc.poll() is not None:
+            return
+        try:
+            proc.stdin.write(b"quit\n")
+            proc.stdin.close()
+            proc.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            proc.kill()
+
+    @classmethod
+    def _tlmgr_shell_command(cls, command: str, timeout: float) -> Optional[Tuple[bool, str]]:
+        """Run one command in the tlmgr shell; None if the shell is unavailable"""
+        proc = cls._get_tlmgr_shell()
+        if proc is None:
+            return None
+        try:
+            proc.stdin.write(f"{command}\n".encode('utf-8'))
+        except OSError:
+            cls._close_tlmgr_shell()
+            return None
+        
+        # Each command's output ends with a line reading OK or ERROR
+        fd = proc.stdout.fileno()
+        deadline = time.monotonic() + timeout
+        buffer = b""
+        output = []
+        while True:
+            while b"\n" in buffer:
+                line, buffer = buffer.split(b"\n", 1)
+                text = line.decode('utf-8', 'replace').strip()
+                if text.startswith("tlmgr>"):
+                    text = text[len("tlmgr>"):].strip()
+                if text in ("OK", "ERROR"):
+                    return text == "OK", "\n".join(output)
+                output.append(text)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([fd], [], [], remaining)[0]:
+                cls._close_tlmgr_shell()
+                raise subprocess.TimeoutExpired(command, timeout)
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                cls._close_tlmgr_shell()
+                return None
+            buffer += chunk
+
+    def _run_tlmgr(self, args: List[str], timeout: float) -> Tuple[bool, str]:
+        """Run a tlmgr action, preferring the shared shell over a fresh process"""
+        with self._tlmgr_shell_lock:
+            outcome = self._tlmgr_shell_command(" ".join(args), timeout)
+        if outcome is not None:
+            return outcome
+        result = subprocess.run(
+            [self._resolve_tool('tlmgr') or 'tlmgr', *args],
+            capture_output=True, text=True, timeout=timeout
+        )
+        return result.returncode == 0, result.stdout + result.stderr
+
     def install_essential_packages(self) -> bool:
         """Install essential packages for scientific papers"""
         if not self.check_tlmgr_installation():
             return False
         
-        print("📦 Installing essential LaTeX packages...")
-        success_count = 0
+        self.logger.info("📦 Installing essential LaTeX packages...")
+        
+        # Only install what is still missing, mapped to TinyTeX names and deduplicated
+        pending = [package for package in self.ESSENTIAL_PACKAGES if package not in self._pkg_state]
+        tlmgr_packages: Dict[str, List[str]] = {}
+        for package in sorted(pending):
+            tlmgr_packages.setdefault(self.PACKAGE_MAPPINGS.get(package, package), []).append(package)
         
-        for package in self.ESSENTIAL_PACKAGES:
-            if self.install_package(package, quiet=True):
-                success_count += 1
+        if tlmgr_packages:
+            # One tlmgr invocation loads the package database once for all packages
+            try:
+                ok, output = self._run_tlmgr(['install', *tlmgr_packages], timeout=60 * len(tlmgr_packages))
+                not_present = set(_TLMGR_NOT_PRESENT_RE.findall(output))
+                batch_ok = ok or bool(not_present)
+            except (subprocess.SubprocessError, OSError) as e:
+                self.logger.warning(f"⚠️  Batch install failed ({e}), installing packages individually...")
+                not_present = set()
+                batch_ok = False
+            
+            if batch_ok:
+                for tlmgr_package, packages in tlmgr_packages.items():
+                    if tlmgr_package in not_present:
+                        self._pkg_state.update(dict.fromkeys(packages, 'failed'))
+                    else:
+                        self._pkg_state.update(dict.fromkeys(packages, 'installed'))
+            else:
+                # Fall back to per-package installs to find out which ones failed
+                for packages in tlmgr_packages.values():
+                    for package in packages:
+                        self.install_package(package, quiet=True)
         
-        print(f"✅ Successfully installed {success_count}/{len(self.ESSENTIAL_PACKAGES)} essential packages")
+        success_count = sum(self._pkg_state.get(package) == 'installed' for package in self.ESSENTIAL_PACKAGES)
+        self.logger.info(f"✅ Successfully installed {success_count}/{len(self.ESSENTIAL_PACKAGES)} essential packages")
         return success_count > len(self.ESSENTIAL_PACKAGES) * 0.8  # 80% success rate
     
     def install_package(self, package_name: str, quiet: bool = False) -> bool:
         """Install a specific LaTeX package"""
-        if package_name in self.installed_packages:
+        state = self._pkg_state.get(package_name)
+        if state == 'installed':
             return True
-        
-        if package_name in self.failed_packages:
+        if state == 'failed':
             return False
         
         # Map package name if needed
@@ -168,71 +554,64 @@ class LaTeXPackageManager:
         
         try:
             if not quiet:
-                print(f"📦 Installing LaTeX package: {package_name}")
+                self.logger.info(f"📦 Installing LaTeX package: {package_name}")
             
-            result = subprocess.run(
-                ['tlmgr', 'install', tlmgr_package],
-                capture_output=True, text=True, timeout=60
-            )
+            ok, output = self._run_tlmgr(['install', tlmgr_package], timeout=60)
             
-            if result.returncode == 0:
-                self.installed_packages.add(package_name)
+            if ok:
+                self._pkg_state[package_name] = 'installed'
                 if not quiet:
-                    print(f"✅ Successfully installed: {package_name}")
+                    self.logger.info(f"✅ Successfully installed: {package_name}")
                 return True
+            elif _TLMGR_LOCK_RE.search(output):
+                # Another tlmgr holds the lock; leave the package retryable
+                if not quiet:
+                    self.logger.info(f"🔒 tlmgr busy, could not install {package_name} yet")
+                return False
             else:
-                self.failed_packages.add(package_name)
+                self._pkg_state[package_name] = 'failed'
                 if not quiet:
-                    print(f"❌ Failed to install {package_name}: {result.stderr.strip()}")
+                    self.logger.error(f"❌ Failed to install {package_name}: {output.strip()}")
                 return False
                 
         except subprocess.TimeoutExpired:
-            print(f"⏰ Timeout installing {package_name}")
-            self.failed_packages.add(package_name)
+            self.logger.warning(f"⏰ Timeout installing {package_name}")
+            self._pkg_state[package_name] = 'failed'
             return False
         except Exception as e:
             if not quiet:
-                print(f"❌ Error installing {package_name}: {e}")
-            self.failed_packages.add(package_name)
+                self.logger.error(f"❌ Error installing {package_name}: {e}")
+            self._pkg_state[package_name] = 'failed'
             return False
     
-    def extract_missing_packages_from_log(self, log_content: str) -> List[str]:
-        """Extract missing package names from LaTeX compilation log"""
+    def _scan_log(self, log_content: str) -> Tuple[List[str], Set[str]]:
+        """Scan a compilation log once for missing packages and common LaTeX errors"""
         missing_packages = []
+        usepackage_lines = []
+        errors_found = set()
+        
+        for match in _LOG_SCANNER.finditer(log_content):
+            kind = match.lastgroup
+            if kind == 'error':
+                errors_found.add(match.group('error'))
+            elif kind == 'usepackage':
+                usepackage_lines.append(match.group('usepackage'))
+            else:
+                missing_packages.append(match.group(kind))
+        
+        # Emergency stop after missing file: the failing \usepackage line names the package
+        if "Emergency stop" in errors_found:
+            missing_packages.extend(usepackage_lines)
         
-        # Pattern 1: ! LaTeX Error: File `package.sty' not found.
-        pattern1 = re.compile(r"! LaTeX Error: File `([^'`]+)\.sty' not found", re.IGNORECASE)
-        matches1 = pattern1.findall(log_content)
-        missing_packages.extend(matches1)
-        
-        # Pattern 2: ! I can't find file `package.sty'.
-        pattern2 = re.compile(r"! I can't find file `([^'`]+)\.sty'", re.IGNORECASE)
-        matches2 = pattern2.findall(log_content)
-        missing_packages.extend(matches2)
-        
-        # Pattern 3: LaTeX Error: File `package.cls' not found.
-        pattern3 = re.compile(r"! LaTeX Error: File `([^'`]+)\.cls' not found", re.IGNORECASE)
-        matches3 = pattern3.findall(log_content)
-        missing_packages.extend(matches3)
-        
-        # Pattern 4: File `package' not found
-        pattern4 = re.compile(r"File `([^'`]+)' not found", re.IGNORECASE)
-        matches4 = pattern4.findall(log_content)
-        # Filter to only .sty and .cls files
-        matches4 = [m for m in matches4 if m.endswith('.sty') or m.endswith('.cls')]
-        missing_packages.extend([m.replace('.sty', '').replace('.cls', '') for m in matches4])
-        
-        # Pattern 5: Emergency stop after missing file
-        if "Emergency stop" in log_content:
-            # Look for the last file that couldn't be found
-            emergency_pattern = re.compile(r"l\.\d+\s+\\usepackage\s*\{([^}]+)\}", re.IGNORECASE)
-            emergency_matches = emergency_pattern.findall(log_content)
-            missing_packages.extend(emergency_matches)
-        
-        # Remove duplicates and return
-        unique_packages = list(set(missing_packages))
-        print(f"🔍 Extracted missing packages: {unique_packages}")
-        return unique_packages
+        # Remove duplicates (keeping log order) and return
+        unique_packages = list(dict.fromkeys(missing_packages))
+        self.logger.info(f"🔍 Extracted missing packages: {unique_packages}")
+        return unique_packages, errors_found
+    
+    def extract_missing_packages_from_log(self, log_content: str) -> List[str]:
+        """Extract missing package names from LaTeX compilation log"""
+        missing_packages, _ = self._scan_log(log_content)
+        return missing_packages
     
     def compile_latex_with_auto_install(self, tex_file: str, max_attempts: int = 3) -> Tuple[bool, str]:
         """
@@ -244,23 +623,42 @@ class LaTeXPackageManager:
         if not os.path.exists(tex_file):
             return False, f"LaTeX file not found: {tex_file}"
         
-        print(f"🔧 Compiling LaTeX file: {tex_file}")
+        self.logger.info(f"🔧 Compiling LaTeX file: {tex_file}")
         working_dir = os.path.dirname(os.path.abspath(tex_file))
+        pdflatex = self._resolve_tool('pdflatex') or 'pdflatex'
+        pdf_file = tex_file.replace('.tex', '.pdf')
+        
+        # Reuse a previous build of identical inputs
+        cache_key = self._compile_cache_key(tex_file)
+        cached_pdf = os.path.join(LATEX_CACHE_DIR, f"{cache_key}.pdf")
+        if os.path.exists(cached_pdf):
+            try:
+                shutil.copyfile(cached_pdf, pdf_file)
+                os.utime(cached_pdf)  # mark as recently used for pruning
+                cached_log = os.path.join(LATEX_CACHE_DIR, f"{cache_key}.log")
+                log_content = ""
+                if os.path.exists(cached_log):
+                    with open(cached_log, 'r', encoding='utf-8', errors='ignore') as f:
+                        log_content = f.read()
+                self.logger.info(f"✅ Inputs unchanged, reused cached PDF: {cached_pdf}")
+                return True, log_content
+            except OSError as e:
+                self.logger.warning(f"⚠️  Could not reuse cached PDF ({e}), compiling...")
         
         for attempt in range(max_attempts):
-            print(f"📝 Compilation attempt {attempt + 1}/{max_attempts}")
+            self.logger.info(f"📝 Compilation attempt {attempt + 1}/{max_attempts}")
             
             # Run pdflatex
             try:
                 result = subprocess.run(
-                    ['pdflatex', '-interaction=nonstopmode', '-halt-on-error', os.path.basename(tex_file)],
+                    [pdflatex, '-interaction=nonstopmode', '-halt-on-error', os.path.basename(tex_file)],
                     cwd=working_dir,
                     capture_output=True,
                     text=True,
                     timeout=120
                 )
                 
-                log_content = result.stdout + result.stderr
+                log_content = "".join((result.stdout, result.stderr))
                 
                 if result.returncode == 0:
                     # Check if we need to run BibTeX (look for citations and bibliography)
@@ -270,14 +668,13 @@ class LaTeXPackageManager:
                     # Check if there are citations that need BibTeX processing
                     needs_bibtex = False
                     if os.path.exists(aux_file):
-                        with open(aux_file, 'r', encoding='utf-8', errors='ignore') as f:
-                            aux_content = f.read()
-                        needs_bibtex = ('\\citation{' in aux_content or 
-                                      '\\bibdata{' in aux_content or 
-                                      'There were undefined citations' in log_content)
+                        with _map_file(aux_file) as aux_content:
+                            needs_bibtex = (aux_content.find(b'\\citation{') != -1 or
+                                          aux_content.find(b'\\bibdata{') != -1 or
+                                          'There were undefined citations' in log_content)
                     
                     if needs_bibtex:
-                        print("📚 Citations detected, running BibTeX...")
+                        self.logger.info("📚 Citations detected, running BibTeX...")
                         try:
                             bibtex_result = subprocess.run(
                                 ['bibtex', tex_basename],
@@ -288,99 +685,184 @@ class LaTeXPackageManager:
                             )
                             
                             if bibtex_result.returncode == 0:
-                                print("✅ BibTeX processing successful!")
+                                self.logger.info("✅ BibTeX processing successful!")
                                 
                                 # Run pdflatex again to incorporate bibliography
-                                print("📝 Running pdflatex again to incorporate bibliography...")
+                                self.logger.info("📝 Running pdflatex again to incorporate bibliography...")
+                                aux_digest = _file_digest(aux_file)
+                                result2 = None
                                 for bibtex_pass in range(2):  # Usually need 2 more passes
                                     result2 = subprocess.run(
-                                        ['pdflatex', '-interaction=nonstopmode', '-halt-on-error', os.path.basename(tex_file)],
+                                        [pdflatex, '-interaction=nonstopmode', '-halt-on-error', os.path.basename(tex_file)],
                                         cwd=working_dir,
                                         capture_output=True,
                                         text=True,
                                         timeout=120
                                     )
                                     if result2.returncode != 0:
-                                        print(f"⚠️  pdflatex pass {bibtex_pass + 2} failed, but continuing...")
+                                        self.logger.warning(f"⚠️  pdflatex pass {bibtex_pass + 2} failed, but continuing...")
+                                        break
+                                    self.logger.info(f"✅ pdflatex pass {bibtex_pass + 2} successful!")
+                                    
+                                    # References are settled once a pass leaves the .aux unchanged
+                                    new_aux_digest = _file_digest(aux_file)
+                                    if new_aux_digest == aux_digest:
                                         break
-                                    print(f"✅ pdflatex pass {bibtex_pass + 2} successful!")
+                                    aux_digest = new_aux_digest
                                 
                                 # Update log content with final compilation
-                                log_content = result2.stdout + result2.stderr if 'result2' in locals() else log_content
+                                if result2 is not None:
+                                    log_content = "".join((result2.stdout, result2.stderr))
                             else:
-                                print(f"⚠️  BibTeX processing failed: {bibtex_result.stderr}")
-                                print("   Continuing with pdflatex-only compilation...")
+                                self.logger.warning(f"⚠️  BibTeX processing failed: {bibtex_result.stderr}")
+                                self.logger.info("   Continuing with pdflatex-only compilation...")
                                 
                         except Exception as e:
-                            print(f"⚠️  BibTeX error: {e}")
-                            print("   Continuing with pdflatex-only compilation...")
+                            self.logger.warning(f"⚠️  BibTeX error: {e}")
+                            self.logger.info("   Continuing with pdflatex-only compilation...")
                     
-                    pdf_file = tex_file.replace('.tex', '.pdf')
                     if os.path.exists(pdf_file):
-                        print(f"✅ LaTeX compilation successful!")
+                        self.logger.info(f"✅ LaTeX compilation successful!")
+                        self._store_compiled_pdf(cache_key, pdf_file, log_content)
                         return True, log_content
                 
-                # Extract missing packages from log
-                missing_packages = self.extract_missing_packages_from_log(log_content)
+                # Extract missing packages from the log tail, where pdflatex reports the fatal error
+                missing_packages, errors_found = self._scan_log(log_content[-LOG_SCAN_TAIL_CHARS:])
                 
                 if not missing_packages:
-                    print(f"❌ LaTeX compilation failed (no missing packages detected)")
-                    print(f"Return code: {result.returncode}")
-                    print(f"Full stdout: {result.stdout[-1000:]}")  # Last 1000 chars
-                    print(f"Full stderr: {result.stderr[-1000:]}")   # Last 1000 chars
+                    self.logger.error(f"❌ LaTeX compilation failed (no missing packages detected)")
+                    self.logger.info(f"Return code: {result.returncode}")
+                    self.logger.info(f"Full stdout: {result.stdout[-1000:]}")  # Last 1000 chars
+                    self.logger.info(f"Full stderr: {result.stderr[-1000:]}")   # Last 1000 chars
                     
                     # Look for other common LaTeX errors
-                    common_errors = [
-                        "Undefined control sequence",
-                        "Missing $ inserted", 
-                        "Extra alignment tab",
-                        "Illegal parameter number",
-                        "File ended while scanning",
-                        "Emergency stop",
-                        "Fatal error occurred"
-                    ]
-                    
-                    for error in common_errors:
-                        if error in log_content:
-                            print(f"🔍 Detected LaTeX error: {error}")
+                    for error in COMMON_LATEX_ERRORS:
+                        if error in errors_found:
+                            self.logger.info(f"🔍 Detected LaTeX error: {error}")
                             break
                     
                     return False, log_content
                 
-                print(f"📦 Missing packages detected: {missing_packages}")
+                self.logger.info(f"📦 Missing packages detected: {missing_packages}")
+                
+                with self._tlmgr_shell_lock:
+                    shell_available = self._get_tlmgr_shell() is not None
+                if shell_available:
+                    # The shared tlmgr shell runs one command at a time: install in turn
+                    results = [self.install_package(package) for package in missing_packages]
+                else:
+                    # Install missing packages concurrently (each install is an independent subprocess)
+                    with ThreadPoolExecutor(max_workers=4) as executor:
+                        results = list(executor.map(self.install_package, missing_packages))
                 
-                # Install missing packages
                 installed_any = False
-                for package in missing_packages:
-                    if self.install_package(package):
+                for package, installed in zip(missing_packages, results):
+                    if not installed and self._pkg_state.get(package) != 'failed':
+                        # Lost the race for tlmgr's lock, retry serially
+                        installed = self.install_package(package)
+                    if installed:
                         installed_any = True
                     else:
                         # Special handling for common package name variations
                         if package == "iclr2025_icbinb" and os.path.exists(os.path.join(working_dir, "iclr2025.sty")):
-                            print(f"🔧 Creating symlink: iclr2025_icbinb.sty -> iclr2025.sty")
+                            self.logger.info(f"🔧 Creating symlink: iclr2025_icbinb.sty -> iclr2025.sty")
                             try:
                                 symlink_path = os.path.join(working_dir, "iclr2025_icbinb.sty")
                                 if not os.path.exists(symlink_path):
                                     os.symlink("iclr2025.sty", symlink_path)
                                     installed_any = True
-                                    print(f"✅ Created symlink for {package}")
+                                    self.logger.info(f"✅ Created symlink for {package}")
                             except Exception as e:
-                                print(f"❌ Failed to create symlink: {e}")
+                                self.logger.error(f"❌ Failed to create symlink: {e}")
                 
                 if not installed_any:
-                    print(f"❌ Could not install any missing packages")
+                    self.logger.error(f"❌ Could not install any missing packages")
                     return False, log_content
                 
             except subprocess.TimeoutExpired:
-                print(f"⏰ LaTeX compilation timeout (attempt {attempt + 1})")
+                self.logger.warning(f"⏰ LaTeX compilation timeout (attempt {attempt + 1})")
                 if attempt == max_attempts - 1:
                     return False, "Compilation timeout"
             except Exception as e:
-                print(f"❌ LaTeX compilation error: {e}")
+                self.logger.error(f"❌ LaTeX compilation error: {e}")
                 return False, str(e)
         
         return False, "Max compilation attempts exceeded"
 
+    def _compile_cache_key(self, tex_file: str) -> str:
+        """Digest of everything a build of tex_file depends on"""
+        working_dir = os.path.dirname(os.path.abspath(tex_file))
+        digest = hashlib.blake2b(digest_size=20)
+        
+        def add_file(path: str) -> None:
+            digest.update(path.encode('utf-8', 'ignore'))
+            try:
+                with open(path, 'rb') as f:
+                    digest.update(f.read())
+            except OSError:
+                digest.update(b'\0missing')
+        
+        def add_figure(path: str) -> None:
+            # Figure identity is its path, mtime and size; without an extension every
+            # file pdflatex could pick for it counts
+            candidates = [path] if os.path.splitext(path)[1] else [path + ext for ext in _GRAPHICS_EXTENSIONS]
+            for candidate in candidates:
+                digest.update(f"{candidate}:{_stat_signature(candidate)}".encode('utf-8', 'ignore'))
+        
+        visited = set()
+        
+        def add_tex(path: str) -> None:
+            """Hash a .tex source and, recursively, what it pulls in (paths resolve from working_dir)"""
+            if path in visited:
+                return
+            visited.add(path)
+            digest.update(path.encode('utf-8', 'ignore'))
+            try:
+                with _map_file(path) as content:
+                    digest.update(content)
+                    dependencies = [(m.group('cmd'), m.group('arg').decode('utf-8', 'ignore'))
+                                    for m in _DEPENDENCY_RE.finditer(content)]
+            except OSError:
+                digest.update(b'\0missing')
+                return
+            
+            for cmd, arg in dependencies:
+                if cmd in (b'input', b'include'):
+                    included = os.path.join(working_dir, arg.strip())
+                    add_tex(included if os.path.splitext(included)[1] else included + '.tex')
+                elif cmd == b'bibliography':
+                    for bib_name in arg.split(','):
+                        add_file(os.path.join(working_dir, f"{bib_name.strip()}.bib"))
+                else:
+                    figure_file = arg.strip()
+                    for figure_path in (os.path.join(working_dir, figure_file),
+                                        os.path.join(working_dir, '..', 'figures', os.path.basename(figure_file)),
+                                        os.path.join(working_dir, 'figures', os.path.basename(figure_file))):
+                        add_figure(figure_path)
+        
+        add_tex(tex_file)
+        
+        # Local style, class and bibliography-style files shipped with the template
+        with os.scandir(working_dir) as entries:
+            for name in sorted(entry.name for entry in entries if entry.name.endswith(('.sty', '.cls', '.bst'))):
+                add_file(os.path.join(working_dir, name))
+        
+        return digest.hexdigest()
+
+    def _store_compiled_pdf(self, cache_key: str, pdf_file: str, log_content: str) -> None:
+        """Save a successful build in the PDF cache (best effort)"""
+        try:
+            os.makedirs(LATEX_CACHE_DIR, exist_ok=True)
+            cached_pdf = os.path.join(LATEX_CACHE_DIR, f"{cache_key}.pdf")
+            tmp_pdf = f"{cached_pdf}.{os.getpid()}.tmp"
+            shutil.copyfile(pdf_file, tmp_pdf)
+            os.replace(tmp_pdf, cached_pdf)
+            with open(os.path.join(LATEX_CACHE_DIR, f"{cache_key}.log"), 'w', encoding='utf-8') as f:
+                f.write(log_content)
+        except OSError as e:
+            self.logger.warning(f"⚠️  Could not cache compiled PDF: {e}")
+        _prune_pdf_cache()
+
     def validate_latex_file(self, tex_file: str) -> Dict[str, List[str]]:
         """Validate LaTeX file for missing references and files"""
         issues = {
@@ -395,130 +877,130 @@ class LaTeXPackageManager:
             issues['warnings'].append(f"LaTeX file not found: {tex_file}")
             return issues
         
-        working_dir = os.path.dirname(tex_file)
+        # Reuse the previous result while the file and everything it was checked against are unchanged
+        tex_path = os.path.abspath(tex_file)
+        cache_key = (tex_path, *_stat_signature(tex_path))
+        cached = self._validate_cache.get(cache_key)
+        if cached is not None:
+            dependencies, cached_issues = cached
+            if all(_stat_signature(path) == signature for path, signature in dependencies.items()):
+                return {name: list(values) for name, values in cached_issues.items()}
+        
+        # Resolve the directory once; every path below is built from it and is already absolute
+        working_dir = os.path.dirname(tex_path)
+        # Directories whose listings and files whose contents the result depends on
+        dependency_paths = {
+            working_dir,
+            os.path.dirname(working_dir),
+            os.path.join(working_dir, 'figures'),
+            os.path.join(os.path.dirname(working_dir), 'figures'),
+        }
         
-        with open(tex_file, 'r', encoding='utf-8', errors='ignore') as f:
-            content = f.read()
+        # Directory name sets answering every existence check below
+        listings: Dict[str, Set[str]] = {}
+        
+        # Collect every command of interest in a single pass over the mapped document
+        figure_files = []
+        package_names = []
+        label_refs = set()
+        label_defs = set()
+        cite_refs = set()
+        bib_files = []
+        inline_cite_defs = set()
+        with _map_file(tex_file) as content:
+            for match in _TEX_SCANNER.finditer(content):
+                cmd = match.group('cmd').decode('ascii')
+                arg = match.group('arg').decode('utf-8', 'ignore')
+                if cmd.startswith('includegraphics'):
+                    figure_files.append(arg)
+                elif cmd in ('usepackage', 'documentclass'):
+                    package_names.extend(pkg.strip() for pkg in arg.split(','))
+                elif cmd == 'label':
+                    label_defs.add(arg)
+                elif cmd.startswith('cite'):
+                    cite_refs.update(cite.strip() for cite in arg.split(','))
+                elif cmd == 'bibliography':
+                    bib_files.append(arg)
+                else:  # ref, eqref, pageref
+                    label_refs.add(arg)
+            
+            # Inline bibliography (filecontents)
+            filecontents_match = _FILECONTENTS_BIB_RE.search(content)
+            if filecontents_match:
+                inline_cite_defs.update(
+                    key.decode('utf-8', 'ignore') for key in _BIB_KEY_RE.findall(filecontents_match.group(1))
+                )
         
         # Check for missing figure files
-        figure_patterns = [
-            r'\\includegraphics(?:\[[^\]]*\])?\{([^}]+)\}',
-            r'\\includegraphics\*(?:\[[^\]]*\])?\{([^}]+)\}',
-        ]
-        
-        for pattern in figure_patterns:
-            matches = re.findall(pattern, content)
-            for match in matches:
-                # Handle relative paths and extensions
-                figure_file = match.strip()
-                if not figure_file.lower().endswith(('.pdf', '.png', '.jpg', '.jpeg', '.eps')):
-                    figure_file += '.pdf'  # Default extension
-                
-                # Check in working directory and figures subdirectory
-                possible_paths = [
-                    os.path.join(working_dir, figure_file),
-                    os.path.join(working_dir, '..', 'figures', os.path.basename(figure_file)),
-                    os.path.join(working_dir, 'figures', os.path.basename(figure_file)),
-                ]
-                
-                if not any(os.path.exists(path) for path in possible_paths):
-                    issues['missing_figures'].append(figure_file)
+        for match in figure_files:
+            # Handle relative paths and extensions
+            figure_file = match.strip()
+            if not figure_file.lower().endswith(('.pdf', '.png', '.jpg', '.jpeg', '.eps')):
+                figure_file += '.pdf'  # Default extension
+            
+            # Check in working directory and figures subdirectory
+            possible_paths = [
+                os.path.join(working_dir, figure_file),
+                os.path.join(working_dir, '..', 'figures', os.path.basename(figure_file)),
+                os.path.join(working_dir, 'figures', os.path.basename(figure_file)),
+            ]
+            
+            if not any(_path_exists(listings, path) for path in possible_paths):
+                issues['missing_figures'].append(figure_file)
+            dependency_paths.add(os.path.dirname(os.path.normpath(possible_paths[0])))
         
         # Check for missing style/class files
-        package_patterns = [
-            r'\\usepackage(?:\[[^\]]*\])?\{([^}]+)\}',
-            r'\\documentclass(?:\[[^\]]*\])?\{([^}]+)\}',
-        ]
-        
-        for pattern in package_patterns:
-            matches = re.findall(pattern, content)
-            for match in matches:
-                packages = [pkg.strip() for pkg in match.split(',')]
-                for package in packages:
-                    if package in ['times', 'amsmath', 'amssymb', 'graphicx']:
-                        continue  # Skip standard packages
-                    
-                    style_file = f"{package}.sty"
-                    class_file = f"{package}.cls"
-                    
-                    style_path = os.path.join(working_dir, style_file)
-                    class_path = os.path.join(working_dir, class_file)
-                    
-                    if not os.path.exists(style_path) and not os.path.exists(class_path):
-                        # Check if it's a standard LaTeX package (rough heuristic)
-                        if not self._is_standard_package(package):
-                            issues['missing_style_files'].append(package)
+        for package in package_names:
+            # Skip standard LaTeX packages (rough heuristic)
+            if package.lower() in _STANDARD_PACKAGES:
+                continue
+            
+            style_file = f"{package}.sty"
+            class_file = f"{package}.cls"
+            
+            style_path = os.path.join(working_dir, style_file)
+            class_path = os.path.join(working_dir, class_file)
+            
+            if not _path_exists(listings, style_path) and not _path_exists(listings, class_path):
+                issues['missing_style_files'].append(package)
         
         # Check for undefined labels (referenced but not defined)
-        label_refs = set(re.findall(r'\\ref\{([^}]+)\}', content))
-        label_refs.update(re.findall(r'\\eqref\{([^}]+)\}', content))
-        label_refs.update(re.findall(r'\\pageref\{([^}]+)\}', content))
-        
-        label_defs = set(re.findall(r'\\label\{([^}]+)\}', content))
-        
         undefined_labels = label_refs - label_defs
         if undefined_labels:
             issues['undefined_labels'] = list(undefined_labels)
         
-        # Check for undefined citations
-        cite_refs = set()
-        cite_patterns = [
-            r'\\cite\{([^}]+)\}',
-            r'\\citep\{([^}]+)\}',
-            r'\\citet\{([^}]+)\}',
-            r'\\citealp\{([^}]+)\}',
-            r'\\citealt\{([^}]+)\}',
-        ]
-        
-        for pattern in cite_patterns:
-            matches = re.findall(pattern, content)
-            for match in matches:
-                citations = [cite.strip() for cite in match.split(',')]
-                cite_refs.update(citations)
-        
-        # Check if bibliography file exists and extract available citations
-        bib_files = re.findall(r'\\bibliography\{([^}]+)\}', content)
+        # Check for undefined citations against the available bibliography
         cite_defs = set()
         
         # Check bibliography files referenced in \bibliography{}
         for bib_file in bib_files:
-            bib_path = os.path.join(working_dir, f"{bib_file}.bib")
-            if os.path.exists(bib_path):
-                with open(bib_path, 'r', encoding='utf-8', errors='ignore') as bf:
-                    bib_content = bf.read()
-                    cite_defs.update(re.findall(r'@[^{]*\{([^,]+),', bib_content))
+            bib_path = os.path.normpath(os.path.join(working_dir, f"{bib_file}.bib"))
+            dependency_paths.add(bib_path)
+            if _path_exists(listings, bib_path):
+                cite_defs.update(self._read_bib_keys(bib_path))
         
         # Check for any .bib files in the directory (even if not explicitly referenced)
         if not cite_defs:
-            for file in os.listdir(working_dir):
-                if file.endswith('.bib'):
-                    bib_path = os.path.join(working_dir, file)
-                    try:
-                        with open(bib_path, 'r', encoding='utf-8', errors='ignore') as bf:
-                            bib_content = bf.read()
-                            cite_defs.update(re.findall(r'@[^{]*\{([^,]+),', bib_content))
-                    except:
-                        continue
+            for bib_path in _find_bib_files(working_dir):
+                dependency_paths.add(bib_path)
+                try:
+                    cite_defs.update(self._read_bib_keys(bib_path))
+                except:
+                    continue
         
         # Also check parent directory for .bib files (common in experiments)
         if not cite_defs:
             parent_dir = os.path.dirname(working_dir)
             if os.path.exists(parent_dir):
-                for file in os.listdir(parent_dir):
-                    if file.endswith('.bib'):
-                        bib_path = os.path.join(parent_dir, file)
-                        try:
-                            with open(bib_path, 'r', encoding='utf-8', errors='ignore') as bf:
-                                bib_content = bf.read()
-                                cite_defs.update(re.findall(r'@[^{]*\{([^,]+),', bib_content))
-                        except:
-                            continue
+                for bib_path in _find_bib_files(parent_dir):
+                    dependency_paths.add(bib_path)
+                    try:
+                        cite_defs.update(self._read_bib_keys(bib_path))
+                    except:
+                        continue
         
         # Also check for inline bibliography (filecontents)
-        filecontents_match = re.search(r'\\begin\{filecontents\}\{[^}]*\.bib\}(.*?)\\end\{filecontents\}', content, re.DOTALL)
-        if filecontents_match:
-            bib_content = filecontents_match.group(1)
-            cite_defs.update(re.findall(r'@[^{]*\{([^,]+),', bib_content))
+        cite_defs.update(inline_cite_defs)
         
         # Only report as undefined if we actually found bibliography files but the citations aren't in them
         if cite_defs:  # We found some bibliography content
@@ -531,18 +1013,30 @@ class LaTeXPackageManager:
                 issues['warnings'].append(f"Citations found but no bibliography files detected: {list(cite_refs)}")
                 # Don't mark as undefined_citations since there's no bibliography to check against
         
-        return issues
+        dependencies = {path: _stat_signature(path) for path in dependency_paths}
+        self._validate_cache[cache_key] = (dependencies, issues)
+        return {name: list(values) for name, values in issues.items()}
+
+    def _forget_validation(self, tex_file: str) -> None:
+        """Drop cached validate_latex_file results for a file that was just rewritten"""
+        tex_path = os.path.abspath(tex_file)
+        for cache_key in [key for key in self._validate_cache if key[0] == tex_path]:
+            del self._validate_cache[cache_key]
+
+    def _read_bib_keys(self, bib_path: str) -> Set[str]:
+        """Return the citation keys defined in a .bib file (cached per mtime and size)"""
+        cache_key = (os.path.abspath(bib_path), *_stat_signature(bib_path))
+        keys = self._bib_cache.get(cache_key)
+        if keys is None:
+            # Keys are ASCII in practice: scan raw bytes and decode only the matches
+            with open(bib_path, 'rb') as bf:
+                keys = {key.decode('utf-8', 'ignore').strip() for key in _BIB_KEY_RE.findall(bf.read())}
+            self._bib_cache[cache_key] = keys
+        return keys
 
     def _is_standard_package(self, package_name: str) -> bool:
         """Check if a package is likely a standard LaTeX package"""
-        standard_packages = {
-            'amsmath', 'amssymb', 'amsfonts', 'graphicx', 'xcolor', 'color',
-            'booktabs', 'array', 'multirow', 'natbib', 'hyperref', 'geometry',
-            'fancyhdr', 'titlesec', 'caption', 'subcaption', 'float', 'placeins',
-            'afterpage', 'times', 'helvet', 'courier', 'palatino', 'mathpazo',
-            'txfonts', 'pxfonts', 'lmodern', 'fourier', 'kpfonts', 'libertine'
-        }
-        return package_name.lower() in standard_packages
+        return package_name.lower() in _STANDARD_PACKAGES
 
     def fix_latex_issues(self, tex_file: str, issues: Dict[str, List[str]]) -> bool:
         """Attempt to fix common LaTeX issues"""
@@ -557,43 +1051,28 @@ class LaTeXPackageManager:
         
         original_content = content
         
-        # Fix missing figures by commenting them out or using draft mode
+        # Collect every replacement first, then rewrite the document in a single pass
+        alternatives = []
+        
+        # Fix missing figures by replacing them with a placeholder box
         if issues['missing_figures']:
-            print(f"🔧 Fixing {len(issues['missing_figures'])} missing figure references...")
-            for figure in issues['missing_figures']:
-                # Replace includegraphics with a placeholder
-                patterns = [
-                    rf'\\includegraphics(?:\[[^\]]*\])?\{{{re.escape(figure)}\}}',
-                    rf'\\includegraphics\*(?:\[[^\]]*\])?\{{{re.escape(figure)}\}}',
-                ]
-                
-                for pattern in patterns:
-                    if re.search(pattern, content):
-                        # Use raw string and escape properly for re.sub
-                        placeholder = r"\\fbox{\\parbox{0.45\\textwidth}{\\centering Missing Figure: " + os.path.basename(figure) + r"}}"
-                        content = re.sub(pattern, placeholder, content)
-                        fixed_anything = True
-                        print(f"  ✅ Replaced missing figure: {figure}")
-        
-        # Fix undefined labels by commenting out references
+            self.logger.info(f"🔧 Fixing {len(issues['missing_figures'])} missing figure references...")
+            alternatives.append(
+                r'\\includegraphics\*?(?:\[[^\]]*\])?\{(?P<figure>%s)\}'
+                % '|'.join(map(re.escape, issues['missing_figures']))
+            )
+        
+        # Fix undefined labels by replacing references with plain text
         if issues['undefined_labels']:
-            print(f"🔧 Fixing {len(issues['undefined_labels'])} undefined label references...")
-            for label in issues['undefined_labels']:
-                patterns = [
-                    rf'\\ref\{{{re.escape(label)}\}}',
-                    rf'\\eqref\{{{re.escape(label)}\}}',
-                    rf'\\pageref\{{{re.escape(label)}\}}',
-                ]
-                
-                for pattern in patterns:
-                    if re.search(pattern, content):
-                        content = re.sub(pattern, f"[REF:{label}]", content)
-                        fixed_anything = True
-                        print(f"  ✅ Replaced undefined reference: {label}")
+            self.logger.info(f"🔧 Fixing {len(issues['undefined_labels'])} undefined label references...")
+            alternatives.append(
+                r'\\(?:ref|eqref|pageref)\{(?P<label>%s)\}'
+                % '|'.join(map(re.escape, issues['undefined_labels']))
+            )
         
         # Handle undefined citations more conservatively
         if issues['undefined_citations']:
-            print(f"⚠️  Found {len(issues['undefined_citations'])} undefined citations - checking if they should be preserved...")
+            self.logger.warning(f"⚠️  Found {len(issues['undefined_citations'])} undefined citations - checking if they should be preserved...")
             
             # Only fix citations if there are NO bibliography files at all
             bib_files_exist = False
@@ -601,12 +1080,8 @@ class LaTeXPackageManager:
             
             # Check for bibliography files in current and parent directories
             for check_dir in [working_dir, os.path.dirname(working_dir)]:
-                if os.path.exists(check_dir):
-                    for file in os.listdir(check_dir):
-                        if file.endswith('.bib'):
-                            bib_files_exist = True
-                            break
-                if bib_files_exist:
+                if os.path.exists(check_dir) and _find_bib_files(check_dir):
+                    bib_files_exist = True
                     break
             
             # Also check for inline bibliography (filecontents)
@@ -614,33 +1089,48 @@ class LaTeXPackageManager:
                 bib_files_exist = True
             
             if not bib_files_exist:
-                print("🔧 No bibliography files found - replacing undefined citations with plain text...")
-                for citation in issues['undefined_citations']:
-                    cite_patterns = [
-                        rf'\\cite\{{{re.escape(citation)}\}}',
-                        rf'\\citep\{{{re.escape(citation)}\}}',
-                        rf'\\citet\{{{re.escape(citation)}\}}',
-                    ]
-                    
-                    for pattern in cite_patterns:
-                        if re.search(pattern, content):
-                            content = re.sub(pattern, f"[{citation}]", content)
-                            fixed_anything = True
-                            print(f"  ✅ Replaced undefined citation: {citation}")
+                self.logger.info("🔧 No bibliography files found - replacing undefined citations with plain text...")
+                alternatives.append(
+                    r'\\cite[pt]?\{(?P<citation>%s)\}'
+                    % '|'.join(map(re.escape, issues['undefined_citations']))
+                )
             else:
-                print("✅ Bibliography files found - preserving citation commands for BibTeX processing")
-                print("   Citations will be resolved during compilation with bibliography")
+                self.logger.info("✅ Bibliography files found - preserving citation commands for BibTeX processing")
+                self.logger.info("   Citations will be resolved during compilation with bibliography")
+        
+        if alternatives:
+            replaced: Dict[str, Dict[str, None]] = {'figure': {}, 'label': {}, 'citation': {}}
+            
+            def replace(match: re.Match) -> str:
+                kind = match.lastgroup
+                name = match.group(kind)
+                replaced[kind][name] = None
+                if kind == 'figure':
+                    return r"\fbox{\parbox{0.45\textwidth}{\centering Missing Figure: " + os.path.basename(name) + "}}"
+                if kind == 'label':
+                    return f"[REF:{name}]"
+                return f"[{name}]"
+            
+            content = re.compile('|'.join(alternatives)).sub(replace, content)
+            
+            # One log record for the whole batch rather than one write per replacement
+            messages = [f"  ✅ Replaced missing figure: {figure}" for figure in replaced['figure']]
+            messages += [f"  ✅ Replaced undefined reference: {label}" for label in replaced['label']]
+            messages += [f"  ✅ Replaced undefined citation: {citation}" for citation in replaced['citation']]
+            if messages:
+                self.logger.info('\n'.join(messages))
+            fixed_anything = any(replaced.values())
         
         # Save the fixed content
+        fixed_anything = fixed_anything and content != original_content
         if fixed_anything:
             backup_file = tex_file + '.backup'
-            with open(backup_file, 'w', encoding='utf-8') as f:
-                f.write(original_content)
-            print(f"📄 Created backup: {backup_file}")
+            _atomic_write(tex_file, content, backup_file)
+            self.logger.info(f"📄 Created backup: {backup_file}")
             
-            with open(tex_file, 'w', encoding='utf-8') as f:
-                f.write(content)
-            print(f"✅ Fixed LaTeX file: {tex_file}")
+            # A rewrite within one timestamp tick can keep mtime and size: drop stale results
+            self._forget_validation(tex_file)
+            self.logger.info(f"✅ Fixed LaTeX file: {tex_file}")
         
         return fixed_anything
 
@@ -658,132 +1148,169 @@ class LaTeXPackageManager:
         issues_found = []
         success = True
         
-        # Check for .bbl files (processed bibliography)
-        bbl_files = [f for f in os.listdir(tex_file_dir) if f.endswith('.bbl')]
+        # Collect .bbl (processed) and .bib (source) bibliography files in one directory pass
+        bbl_files, bib_files = [], []
+        buckets = {'.bbl': bbl_files, '.bib': bib_files}
+        with os.scandir(tex_file_dir) as entries:
+            for entry in entries:
+                # Match the suffix first: most entries (figures, logs) are rejected without a stat
+                bucket = buckets.get(os.path.splitext(entry.name)[1])
+                if bucket is not None and entry.is_file():
+                    bucket.append((entry.name, entry.path))
+        # Processed bibliographies are reported ahead of the sources
+        tasks = ([(self._process_bbl_file, name, path) for name, path in bbl_files]
+                 + [(self._process_bib_file, name, path) for name, path in bib_files])
+        
+        def run(task):
+            process, name, path = task
+            return process(name, path, auto_fix)
+        
+        # Files are independent: process several at once, then report in listing order
+        if len(tasks) > 1:
+            with ThreadPoolExecutor(max_workers=min(8, len(tasks))) as executor:
+                results = list(executor.map(run, tasks))
+        else:
+            results = [run(task) for task in tasks]
+        
+        for file_success, file_issues, messages in results:
+            for level, message in messages:
+                self.logger.log(level, message)
+            issues_found.extend(file_issues)
+            success = success and file_success
+        
+        return success, issues_found
+    
+    def _process_bbl_file(self, bbl_file: str, bbl_path: str, auto_fix: bool) -> Tuple[bool, List[str], List[Tuple[int, str]]]:
+        """Check (and optionally fix) one .bbl file; returns (success, issues, log messages)"""
+        issues_found = []
+        success = True
+        messages = [(logging.INFO, f"🔍 Validating BibTeX file: {bbl_file}")]
         
-        for bbl_file in bbl_files:
-            bbl_path = os.path.join(tex_file_dir, bbl_file)
-            print(f"🔍 Validating BibTeX file: {bbl_file}")
+        try:
+            with open(bbl_path, 'r', encoding='utf-8', buffering=IO_BUFSIZE) as f:
+                content = f.read()
             
-            try:
-                with open(bbl_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                original_content = content
-                
-                # Fix 1: Unescaped ampersands in journal names and titles
-                # Look for patterns like "Journal & Management" and replace with "Journal \& Management"
-                ampersand_pattern = r'([^\\])&([^&])'  # & not preceded by \ and not followed by &
-                if re.search(ampersand_pattern, content):
-                    issues_found.append(f"Unescaped ampersands found in {bbl_file}")
-                    if auto_fix:
-                        content = re.sub(ampersand_pattern, r'\1\\&\2', content)
-                        print(f"🔧 Fixed unescaped ampersands in {bbl_file}")
-                
-                # Fix 2: Unescaped underscores in URLs or titles
-                underscore_pattern = r'([^\\])_([^{])'  # _ not preceded by \ and not in {}
-                if re.search(underscore_pattern, content):
-                    issues_found.append(f"Unescaped underscores found in {bbl_file}")
-                    if auto_fix:
-                        content = re.sub(underscore_pattern, r'\1\\_\2', content)
-                        print(f"🔧 Fixed unescaped underscores in {bbl_file}")
+            # Most files contain none of the special characters: skip the regex scan
+            if not any(char in content for char in '&_#%'):
+                return success, issues_found, messages
+            
+            # Fix unescaped ampersands (e.g. "Journal & Management" -> "Journal \& Management"),
+            # underscores, hash and percent symbols in a single pass
+            if auto_fix:
+                found_chars = set()
                 
-                # Fix 3: Unescaped hash symbols
-                hash_pattern = r'([^\\])#([^{])'  # # not preceded by \ and not in {}
-                if re.search(hash_pattern, content):
-                    issues_found.append(f"Unescaped hash symbols found in {bbl_file}")
-                    if auto_fix:
-                        content = re.sub(hash_pattern, r'\1\\#\2', content)
-                        print(f"🔧 Fixed unescaped hash symbols in {bbl_file}")
+                def escape(match: re.Match) -> str:
+                    found_chars.add(match.group(0))
+                    return '\\' + match.group(0)
                 
-                # Fix 4: Unescaped percent symbols
-                percent_pattern = r'([^\\])%([^{])'  # % not preceded by \ and not in {}
-                if re.search(percent_pattern, content):
-                    issues_found.append(f"Unescaped percent symbols found in {bbl_file}")
+                fixed_content = _BBL_ESCAPE_RE.sub(escape, content)
+            else:
+                # Report only: collect the characters without building a fixed copy
+                found_chars = set(_BBL_ESCAPE_RE.findall(content))
+            for char, description in _BBL_ESCAPE_DESCRIPTIONS:
+                if char in found_chars:
+                    issues_found.append(f"Unescaped {description} found in {bbl_file}")
                     if auto_fix:
-                        content = re.sub(percent_pattern, r'\1\\%\2', content)
-                        print(f"🔧 Fixed unescaped percent symbols in {bbl_file}")
-                
-                # Save the fixed content if changes were made
-                if auto_fix and content != original_content:
-                    # Create backup
-                    backup_path = bbl_path + '.syntax_backup'
-                    shutil.copy2(bbl_path, backup_path)
-                    
-                    with open(bbl_path, 'w', encoding='utf-8') as f:
-                        f.write(content)
-                    
-                    print(f"💾 Fixed BibTeX file saved, backup at: {backup_path}")
+                        messages.append((logging.INFO, f"🔧 Fixed unescaped {description} in {bbl_file}"))
+            
+            # Save the fixed content if changes were made
+            if auto_fix and found_chars:
+                # Create backup
+                backup_path = bbl_path + '.syntax_backup'
+                _atomic_write(bbl_path, fixed_content, backup_path)
                 
-            except Exception as e:
-                issues_found.append(f"Error processing {bbl_file}: {e}")
-                success = False
-                print(f"❌ Error validating {bbl_file}: {e}")
+                messages.append((logging.INFO, f"💾 Fixed BibTeX file saved, backup at: {backup_path}"))
+            
+        except Exception as e:
+            issues_found.append(f"Error processing {bbl_file}: {e}")
+            success = False
+            messages.append((logging.ERROR, f"❌ Error validating {bbl_file}: {e}"))
         
-        # Also check .bib files (source bibliography)
-        bib_files = [f for f in os.listdir(tex_file_dir) if f.endswith('.bib')]
+        return success, issues_found, messages
+    
+    def _process_bib_file(self, bib_file: str, bib_path: str, auto_fix: bool) -> Tuple[bool, List[str], List[Tuple[int, str]]]:
+        """Check (and optionally fix) one .bib file; returns (success, issues, log messages)"""
+        issues_found = []
+        success = True
+        messages = [(logging.INFO, f"🔍 Validating source bibliography: {bib_file}")]
         
-        for bib_file in bib_files:
-            bib_path = os.path.join(tex_file_dir, bib_file)
-            print(f"🔍 Validating source bibliography: {bib_file}")
+        try:
+            with open(bib_path, 'r', encoding='utf-8', buffering=IO_BUFSIZE) as f:
+                content = f.read()
             
-            try:
-                with open(bib_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                original_content = content
-                
-                # Fix unescaped ampersands in .bib files (more comprehensive)
-                # Pattern 1: & in journal names, titles, etc.
-                field_ampersand_pattern = r'(\s*=\s*\{[^}]*[^\\])&([^}]*\})'
-                if re.search(field_ampersand_pattern, content):
-                    issues_found.append(f"Unescaped ampersands in fields found in {bib_file}")
-                    if auto_fix:
-                        content = re.sub(field_ampersand_pattern, r'\1\\&\2', content)
-                        print(f"🔧 Fixed unescaped ampersands in bibliography fields in {bib_file}")
-                
-                # Fix HTML entities that shouldn't be in BibTeX
-                html_entities = {
-                    '&amp;': '\\&',
-                    '&lt;': '<',
-                    '&gt;': '>',
-                    '&quot;': '"',
-                    '&#39;': "'"
-                }
+            # Every fix below (ampersands and HTML entities) involves '&'
+            if '&' not in content:
+                return success, issues_found, messages
+            
+            changed = False
+            
+            # Fix unescaped ampersands in .bib files (more comprehensive)
+            # Pattern 1: & in journal names, titles, etc.
+            fixed_content, count = _BIB_FIELD_AMP_RE.subn(r'\1\\&\2', content)
+            if count:
+                issues_found.append(f"Unescaped ampersands in fields found in {bib_file}")
+                if auto_fix:
+                    content = fixed_content
+                    changed = True
+                    messages.append((logging.INFO, f"🔧 Fixed unescaped ampersands in bibliography fields in {bib_file}"))
+            
+            # Fix HTML entities that shouldn't be in BibTeX
+            if auto_fix:
+                found_entities = set()
                 
-                for entity, replacement in html_entities.items():
-                    if entity in content:
-                        issues_found.append(f"HTML entity {entity} found in {bib_file}")
-                        if auto_fix:
-                            content = content.replace(entity, replacement)
-                            print(f"🔧 Fixed HTML entity {entity} → {replacement} in {bib_file}")
+                def unescape(match: re.Match) -> str:
+                    found_entities.add(match.group(0))
+                    return _HTML_ENTITIES[match.group(0)]
                 
-                # Fix unescaped special characters in other contexts
-                # Pattern 2: & in author names, addresses, etc.
-                general_ampersand_pattern = r'([^\\]&)([^&\s])'
-                if re.search(general_ampersand_pattern, content):
-                    issues_found.append(f"Unescaped ampersands in general content found in {bib_file}")
+                fixed_content = _HTML_ENTITY_RE.sub(unescape, content)
+            else:
+                found_entities = set(_HTML_ENTITY_RE.findall(content))
+            for entity, replacement in _HTML_ENTITIES.items():
+                if entity in found_entities:
+                    issues_found.append(f"HTML entity {entity} found in {bib_file}")
                     if auto_fix:
-                        content = re.sub(general_ampersand_pattern, r'\1\\&\2', content)
-                        print(f"🔧 Fixed unescaped ampersands in general content in {bib_file}")
-                
-                # Save the fixed content if changes were made
-                if auto_fix and content != original_content:
-                    # Create backup
-                    backup_path = bib_path + '.syntax_backup'
-                    shutil.copy2(bib_path, backup_path)
-                    
-                    with open(bib_path, 'w', encoding='utf-8') as f:
-                        f.write(content)
-                    
-                    print(f"💾 Fixed source bibliography saved, backup at: {backup_path}")
+                        messages.append((logging.INFO, f"🔧 Fixed HTML entity {entity} → {replacement} in {bib_file}"))
+            if auto_fix and found_entities:
+                content = fixed_content
+                changed = True
+            
+            # Fix unescaped special characters in other contexts
+            # Pattern 2: & in author names, addresses, etc.
+            fixed_content, count = _BIB_GEN_AMP_RE.subn(r'\\&', content)
+            if count:
+                issues_found.append(f"Unescaped ampersands in general content found in {bib_file}")
+                if auto_fix:
+                    content = fixed_content
+                    changed = True
+                    messages.append((logging.INFO, f"🔧 Fixed unescaped ampersands in general content in {bib_file}"))
+            
+            # Save the fixed content if changes were made
+            if changed:
+                # Create backup
+                backup_path = bib_path + '.syntax_backup'
+                _atomic_write(bib_path, content, backup_path)
                 
-            except Exception as e:
-                issues_found.append(f"Error processing {bib_file}: {e}")
-                success = False
-                print(f"❌ Error validating {bib_file}: {e}")
+                messages.append((logging.INFO, f"💾 Fixed source bibliography saved, backup at: {backup_path}"))
+            
+        except Exception as e:
+            issues_found.append(f"Error processing {bib_file}: {e}")
+            success = False
+            messages.append((logging.ERROR, f"❌ Error validating {bib_file}: {e}"))
         
-        return success, issues_found
+        return success, issues_found, messages
+    
+    def _has_bibliography(self, directory: str) -> bool:
+        """Whether a directory contains any .bbl or .bib files, cached until its entries change"""
+        try:
+            cache_key = (directory, os.stat(directory).st_mtime_ns)
+        except OSError:
+            return False
+        has_bib = self._has_bib_cache.get(cache_key)
+        if has_bib is None:
+            with os.scandir(directory) as entries:
+                has_bib = any(entry.name.endswith(('.bbl', '.bib')) for entry in entries)
+            self._has_bib_cache[cache_key] = has_bib
+        return has_bib
     
     def detect_bibtex_compilation_errors(self, log_content: str) -> List[str]:
         """
@@ -795,188 +1322,181 @@ class LaTeXPackageManager:
         Returns:
             List of detected BibTeX error messages
         """
-        bibtex_errors = []
-        
-        # Error patterns to look for
-        error_patterns = [
-            (r'! Misplaced alignment tab character &', 'Unescaped ampersand in bibliography'),
-            (r'! Undefined control sequence.*\\&', 'Malformed ampersand escape'),
-            (r'! LaTeX Error: Something\'s wrong--perhaps a missing \\item', 'Bibliography formatting error'),
-            (r'Package natbib Warning: Citation .* undefined', 'Undefined citations'),
-            (r'! Package natbib Error:', 'NatBib package error'),
-            (r'! I can\'t find file.*\.bbl', 'Missing bibliography file'),
-        ]
-        
-        for pattern, description in error_patterns:
-            if re.search(pattern, log_content, re.IGNORECASE):
-                bibtex_errors.append(description)
-        
-        return bibtex_errors
+        found = set()
+        for match in _BIBTEX_LOG_RE.finditer(log_content):
+            found.add(match.lastgroup)
+            if len(found) == len(_BIBTEX_ERROR_PATTERNS):
+                break
+        
+        # Report in pattern order, once per pattern
+        return [description for i, (_, description) in enumerate(_BIBTEX_ERROR_PATTERNS)
+                if f'p{i}' in found]
+
+    @classmethod
+    def _validate_template(cls, tex_file: str) -> Dict:
+        """Run the shared template structure validator with auto-fix on a file"""
+        tex_path = os.path.abspath(tex_file)
+        with cls._template_validator_lock:
+            cache_key = (tex_path, *_stat_signature(tex_path))
+            results = cls._template_results.get(cache_key)
+            if results is not None:
+                return results
+            if cls._template_validator is None:
+                cls._template_validator = LaTeXTemplateValidator()
+            results = cls._template_validator.validate_and_fix_template(tex_file, auto_fix=True)
+            if results["success"] and not results["backup_created"]:
+                cls._template_results[cache_key] = results
+            return results
 
     def compile_latex_with_validation(self, tex_file: str, max_attempts: int = 3, auto_fix: bool = True) -> Tuple[bool, str]:
         """Compile LaTeX with pre-compilation validation and fixing"""
-        print(f"🔍 Validating LaTeX file: {tex_file}")
+        self.logger.info(f"🔍 Validating LaTeX file: {tex_file}")
+        # Resolve the paths once for every step below
+        tex_path = os.path.abspath(tex_file)
+        tex_file_dir = os.path.dirname(tex_path)
         
         # Step 0: Template structure validation (new!)
         if TEMPLATE_VALIDATOR_AVAILABLE and auto_fix:
-            print("🏗️  Performing template structure validation...")
+            self.logger.info("🏗️  Performing template structure validation...")
             try:
-                validator = LaTeXTemplateValidator()
-                results = validator.validate_and_fix_template(tex_file, auto_fix=True)
+                results = self._validate_template(tex_path)
                 
                 if results["success"]:
                     if results["needs_fixing"]:
-                        print(f"🔧 Fixed {len(results['fixes_applied'])} template structure issues:")
+                        self._forget_validation(tex_path)
+                        self.logger.info(f"🔧 Fixed {len(results['fixes_applied'])} template structure issues:")
                         for fix in results['fixes_applied'][:3]:  # Show first 3
-                            print(f"   • {fix}")
+                            self.logger.info(f"   • {fix}")
                         if len(results['fixes_applied']) > 3:
-                            print(f"   • ... and {len(results['fixes_applied']) - 3} more")
+                            self.logger.info(f"   • ... and {len(results['fixes_applied']) - 3} more")
                     else:
-                        print("✅ Template structure validation passed")
+                        self.logger.info("✅ Template structure validation passed")
                 else:
-                    print(f"⚠️  Template structure validation failed: {results.get('error', 'Unknown error')}")
+                    self.logger.warning(f"⚠️  Template structure validation failed: {results.get('error', 'Unknown error')}")
                     
             except Exception as e:
-                print(f"⚠️  Template structure validation failed: {e}")
-                print("   Proceeding with content validation")
+                self.logger.warning(f"⚠️  Template structure validation failed: {e}")
+                self.logger.info("   Proceeding with content validation")
         elif not TEMPLATE_VALIDATOR_AVAILABLE:
-            print("ℹ️  Template structure validator not available")
+            self.logger.info("ℹ️  Template structure validator not available")
+        
+        # Without auto-fix nothing below modifies the sources, so compile in the
+        # background while the content validation runs
+        compile_executor = None
+        compile_future = None
+        if not auto_fix:
+            compile_executor = ThreadPoolExecutor(max_workers=1)
+            compile_future = compile_executor.submit(self.compile_latex_with_auto_install, tex_file, max_attempts)
         
-        # Step 1: Validate the file content
-        issues = self.validate_latex_file(tex_file)
+        try:
+            # Step 1: Validate the file content
+            issues = self.validate_latex_file(tex_path)
         
-        # Report issues
-        total_issues = sum(len(issue_list) for issue_list in issues.values() if isinstance(issue_list, list))
+            # Report issues
+            total_issues = sum(len(issue_list) for issue_list in issues.values() if isinstance(issue_list, list))
         
-        if total_issues > 0:
-            print(f"⚠️  Found {total_issues} potential issues:")
+            if total_issues > 0:
+                self.logger.warning(f"⚠️  Found {total_issues} potential issues:")
             
-            if issues['missing_figures']:
-                print(f"  📷 Missing figures ({len(issues['missing_figures'])}): {', '.join(issues['missing_figures'][:5])}")
-                if len(issues['missing_figures']) > 5:
-                    print(f"    ... and {len(issues['missing_figures']) - 5} more")
+                # Collect the report and emit it as a single record
+                report = []
+                if issues['missing_figures']:
+                    report.append(f"  📷 Missing figures ({len(issues['missing_figures'])}): {', '.join(issues['missing_figures'][:5])}")
+                    if len(issues['missing_figures']) > 5:
+                        report.append(f"    ... and {len(issues['missing_figures']) - 5} more")
             
-            if issues['missing_style_files']:
-                print(f"  📄 Missing style files ({len(issues['missing_style_files'])}): {', '.join(issues['missing_style_files'])}")
+                if issues['missing_style_files']:
+                    report.append(f"  📄 Missing style files ({len(issues['missing_style_files'])}): {', '.join(issues['missing_style_files'])}")
             
-            if issues['undefined_labels']:
-                print(f"  🏷️  Undefined labels ({len(issues['undefined_labels'])}): {', '.join(issues['undefined_labels'][:3])}")
-                if len(issues['undefined_labels']) > 3:
-                    print(f"    ... and {len(issues['undefined_labels']) - 3} more")
+                if issues['undefined_labels']:
+                    report.append(f"  🏷️  Undefined labels ({len(issues['undefined_labels'])}): {', '.join(issues['undefined_labels'][:3])}")
+                    if len(issues['undefined_labels']) > 3:
+                        report.append(f"    ... and {len(issues['undefined_labels']) - 3} more")
             
-            if issues['undefined_citations']:
-                print(f"  📚 Undefined citations ({len(issues['undefined_citations'])}): {', '.join(issues['undefined_citations'][:3])}")
-                if len(issues['undefined_citations']) > 3:
-                    print(f"    ... and {len(issues['undefined_citations']) - 3} more")
+                if issues['undefined_citations']:
+                    report.append(f"  📚 Undefined citations ({len(issues['undefined_citations'])}): {', '.join(issues['undefined_citations'][:3])}")
+                    if len(issues['undefined_citations']) > 3:
+                        report.append(f"    ... and {len(issues['undefined_citations']) - 3} more")
             
-            # Step 2: Try to fix issues automatically
-            if auto_fix:
-                print("🔧 Attempting to fix issues automatically...")
-                if self.fix_latex_issues(tex_file, issues):
-                    print("✅ Issues fixed, proceeding with compilation")
+                if report:
+                    self.logger.info('\n'.join(report))
+            
+                # Step 2: Try to fix issues automatically
+                if auto_fix:
+                    self.logger.info("🔧 Attempting to fix issues automatically...")
+                    if self.fix_latex_issues(tex_file, issues):
+                        self.logger.info("✅ Issues fixed, proceeding with compilation")
+                    else:
+                        self.logger.warning("⚠️  Could not fix all issues, attempting compilation anyway")
                 else:
-                    print("⚠️  Could not fix all issues, attempting compilation anyway")
+                    self.logger.warning("⚠️  Auto-fix disabled, attempting compilation with issues")
             else:
-                print("⚠️  Auto-fix disabled, attempting compilation with issues")
-        else:
-            print("✅ No issues found, proceeding with compilation")
-        
-        # Step 2.5: BibTeX validation and fixing (new!)
-        tex_file_dir = os.path.dirname(os.path.abspath(tex_file))
-        if auto_fix:
-            print("📚 Performing BibTeX validation...")
-            try:
-                bibtex_success, bibtex_issues = self.validate_and_fix_bibtex_files(tex_file_dir, auto_fix=True)
+                self.logger.info("✅ No issues found, proceeding with compilation")
+        
+            # Step 2.5: BibTeX validation and fixing (new!)
+            if auto_fix and not self._has_bibliography(tex_file_dir):
+                self.logger.info("ℹ️  No bibliography files found, skipping BibTeX validation")
+            elif auto_fix:
+                self.logger.info("📚 Performing BibTeX validation...")
+                try:
+                    bibtex_success, bibtex_issues = self.validate_and_fix_bibtex_files(tex_file_dir, auto_fix=True)
                 
-                if bibtex_issues:
-                    print(f"🔧 Fixed {len(bibtex_issues)} BibTeX issues:")
-                    for issue in bibtex_issues[:3]:  # Show first 3
-                        print(f"   • {issue}")
-                    if len(bibtex_issues) > 3:
-                        print(f"   • ... and {len(bibtex_issues) - 3} more")
-                else:
-                    print("✅ No BibTeX issues found")
+                    if bibtex_issues:
+                        self.logger.info(f"🔧 Fixed {len(bibtex_issues)} BibTeX issues:")
+                        for issue in bibtex_issues[:3]:  # Show first 3
+                            self.logger.info(f"   • {issue}")
+                        if len(bibtex_issues) > 3:
+                            self.logger.info(f"   • ... and {len(bibtex_issues) - 3} more")
+                    else:
+                        self.logger.info("✅ No BibTeX issues found")
                     
-            except Exception as e:
-                print(f"⚠️  BibTeX validation failed: {e}")
-                print("   Proceeding with compilation")
+                except Exception as e:
+                    self.logger.warning(f"⚠️  BibTeX validation failed: {e}")
+                    self.logger.info("   Proceeding with compilation")
         
-        # Step 3: Compile with the existing method
-        success, log_content = self.compile_latex_with_auto_install(tex_file, max_attempts)
+            # Step 3: Compile with the existing method
+            if compile_future is not None:
+                success, log_content = compile_future.result()
+            else:
+                success, log_content = self.compile_latex_with_auto_install(tex_file, max_attempts)
+        finally:
+            # Also when validation raises, so the compile thread is not left behind
+            if compile_executor is not None:
+                compile_executor.shutdown()
         
         # Step 4: Post-compilation BibTeX error detection
         if not success and log_content:
             bibtex_errors = self.detect_bibtex_compilation_errors(log_content)
             if bibtex_errors:
-                print("📚 Detected BibTeX-related compilation errors:")
+                self.logger.info("📚 Detected BibTeX-related compilation errors:")
                 for error in bibtex_errors:
-                    print(f"   • {error}")
+                    self.logger.info(f"   • {error}")
                 
                 # If we found BibTeX errors and auto_fix is enabled, try to fix and recompile
-                if auto_fix:
-                    print("🔧 Attempting to fix BibTeX errors and recompile...")
+                if auto_fix and self._has_bibliography(tex_file_dir):
+                    self.logger.info("🔧 Attempting to fix BibTeX errors and recompile...")
                     bibtex_success, bibtex_issues = self.validate_and_fix_bibtex_files(tex_file_dir, auto_fix=True)
                     if bibtex_issues:
-                        print("🔄 Retrying compilation after BibTeX fixes...")
+                        self.logger.info("🔄 Retrying compilation after BibTeX fixes...")
                         success, log_content = self.compile_latex_with_auto_install(tex_file, 1)  # Single retry
         
         return success, log_content
     
     def create_package_install_script(self, output_file: str = "install_latex_packages.sh"):
         """Create a shell script to install all essential packages"""
-        script_content = """#!/bin/bash
-# LaTeX Package Installation Script for AI Scientist
-# Run this script to install essential packages for scientific paper generation
-
-echo "🚀 Installing essential LaTeX packages for AI Scientist..."
-
-# Check if tlmgr is available
-if ! command -v tlmgr &> /dev/null; then
-    echo "❌ tlmgr not found. Please install TinyTeX first:"
-    echo "   R: tinytex::install_tinytex()"
-    echo "   Or visit: https://yihui.org/tinytex/"
-    exit 1
-fi
-
-# Essential packages for scientific papers
-PACKAGES=(
-    "siunitx" "multirow" "algorithm2e" "algorithms"
-    "amsmath" "amsfonts" "amssymb" "amsthm" "mathtools"
-    "graphicx" "subfigure" "booktabs" "array"
-    "hyperref" "url" "natbib" "cite"
-    "xcolor" "tikz" "pgfplots" "listings"
-    "geometry" "fancyhdr" "setspace" "enumitem"
-    "caption" "float" "placeins"
-)
-
-success_count=0
-total_count=${#PACKAGES[@]}
-
-for package in "${PACKAGES[@]}"; do
-    echo "📦 Installing $package..."
-    if tlmgr install "$package" 2>/dev/null; then
-        echo "✅ $package installed successfully"
-        ((success_count++))
-    else
-        echo "⚠️  $package installation failed (may already be installed)"
-    fi
-done
-
-echo "🎉 Installation complete: $success_count/$total_count packages processed"
-echo "✅ LaTeX environment ready for AI Scientist!"
-"""
-        
-        with open(output_file, 'w') as f:
-            f.write(script_content)
+        with open(output_file, 'wb') as f:
+            f.write(_INSTALL_SCRIPT_BYTES)
         
         # Make script executable
         os.chmod(output_file, 0o755)
-        print(f"📝 Created package installation script: {output_file}")
-        print(f"   Run with: ./{output_file}")
+        self.logger.info(f"📝 Created package installation script: {output_file}")
+        self.logger.info(f"   Run with: ./{output_file}")
 
 
 def main():
     """Main function for testing the package manager"""
+    logging.basicConfig(format="%(message)s", stream=sys.stdout)
+    logger.setLevel(logging.INFO)
     manager = LaTeXPackageManager()
     
     print("🔍 LaTeX Environment Check")
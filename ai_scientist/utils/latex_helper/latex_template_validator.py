@@ -9,12 +9,62 @@ import re
 import shutil
 from typing import List, Dict, Tuple, Optional
 
+# Fixed markers, found with plain substring searches
+_BEGIN_DOC = '\\begin{document}'
+_END_DOC = '\\end{document}'
+_MAKETITLE = '\\maketitle'
+
+# Patterns used by the structure checks, compiled once at import
+# Where to insert a missing \begin{document}, in order of preference
+_DOC_INSERTION_RES = [
+    re.compile(r'(\\maketitle)'),
+    re.compile(r'(\\title\{[^}]*\}\s*\\author\{[^}]*\})'),
+    re.compile(r'(\\begin\{abstract\})'),
+    re.compile(r'(\\section\{)'),
+]
+# A whole line holding a command that belongs in the preamble (\documentclass, \usepackage,
+# \newcommand, \renewcommand, or \input of a .sty/commands file)
+_PREAMBLE_CMD_LINE_RE = re.compile(
+    r'^[^\n]*?\\(?:documentclass|usepackage|newcommand|renewcommand'
+    r'|input\{[^}]*(?:\.sty|commands[^}]*)\})[^\n]*$',
+    re.MULTILINE
+)
+_TITLE_CMD_RE = re.compile(r'\\title\{[^}]*\}')
+_AUTHOR_CMD_RE = re.compile(r'\\author\{[^}]*\}')
+_MAKETITLE_WS_RE = re.compile(r'\\maketitle\s*')
+_ABSTRACT_BLOCK_RE = re.compile(r'\\begin\{abstract\}.*?\\end\{abstract\}', re.DOTALL)
+_BIBLIOGRAPHY_RE = re.compile(r'\\bibliography\{([^}]+)\}')
+# \ref{...} and \label{...} in one pattern: group 1 is the command, group 2 the name
+_REF_OR_LABEL_RE = re.compile(r'\\(ref|label)\{([^}]+)\}')
+# A whole figure environment, or a \ref/\label outside one, dispatched on match.lastgroup
+_FIGURE_OR_XREF_RE = re.compile(
+    r'(?P<figure>\\begin\{figure\}.*?\\end\{figure\})'
+    r'|\\(?P<xref>ref|label)\{(?P<name>[^}]+)\}',
+    re.DOTALL
+)
+_CAPTION_RE = re.compile(r'\\caption\{([^}]+)\}')
+_SECTION_RE = re.compile(r'\\((?:sub)*section)\{([^}]+)\}')
+# Characters replaced by '_' when deriving a label from a caption or title
+_LABEL_UNSAFE_RE = re.compile(r'[^a-zA-Z0-9_]')
+
+def _splice(content: str, edits: List[Tuple[int, int, str]]) -> str:
+    """Apply non-overlapping (start, end, replacement) edits in one pass over content"""
+    parts = []
+    cursor = 0
+    for start, end, replacement in sorted(edits):
+        parts.append(content[cursor:start])
+        parts.append(replacement)
+        cursor = end
+    parts.append(content[cursor:])
+    return ''.join(parts)
+
 class LaTeXTemplateValidator:
     """Validates and fixes LaTeX template structure issues"""
     
     def __init__(self):
         self.issues_found = []
         self.fixes_applied = []
+        self._fix_count = 0
     
     def validate_and_fix_template(self, tex_file: str, auto_fix: bool = True) -> Dict[str, any]:
         """
@@ -33,6 +83,7 @@ class LaTeXTemplateValidator:
         # Reset state
         self.issues_found = []
         self.fixes_applied = []
+        self._fix_count = 0
         
         # Read the file
         try:
@@ -45,9 +96,16 @@ class LaTeXTemplateValidator:
         
         # Run all validation checks
         content = self._check_document_structure(content, auto_fix)
-        content = self._check_preamble_content(content, auto_fix)
-        content = self._check_title_author_placement(content, auto_fix)
-        content = self._check_abstract_placement(content, auto_fix)
+        
+        # Split once at \begin{document}; the placement checks work on the two halves
+        begin_doc_pos = content.find(_BEGIN_DOC)
+        if begin_doc_pos != -1:
+            preamble, document_body = content[:begin_doc_pos], content[begin_doc_pos:]
+            preamble, document_body = self._check_preamble_content(preamble, document_body, auto_fix)
+            preamble, document_body = self._check_title_author_placement(preamble, document_body, auto_fix)
+            preamble, document_body = self._check_abstract_placement(preamble, document_body, auto_fix)
+            content = preamble + document_body
+        
         content = self._check_bibliography_setup(content, auto_fix)
         content = self._check_figure_references(content, auto_fix)
         content = self._check_section_structure(content, auto_fix)
@@ -63,7 +121,7 @@ class LaTeXTemplateValidator:
                 f.write(content)
             
             self.fixes_applied.append(f"Created backup: {backup_file}")
-            self.fixes_applied.append(f"Applied {len([f for f in self.fixes_applied if f.startswith('Fixed')])} structural fixes")
+            self.fixes_applied.append(f"Applied {self._fix_count} structural fixes")
         
         return {
             "success": True,
@@ -77,113 +135,69 @@ class LaTeXTemplateValidator:
         """Check for proper \begin{document} ... \end{document} structure"""
         
         # Check if \begin{document} exists
-        if not re.search(r'\\begin\{document\}', content):
+        if _BEGIN_DOC not in content:
             self.issues_found.append("Missing \\begin{document}")
             if auto_fix:
                 # Find a good place to insert it (after preamble, before content)
                 # Look for \maketitle, \title, or first section
-                insertion_patterns = [
-                    r'(\\maketitle)',
-                    r'(\\title\{[^}]*\}\s*\\author\{[^}]*\})',
-                    r'(\\begin\{abstract\})',
-                    r'(\\section\{)'
-                ]
-                
-                for pattern in insertion_patterns:
-                    match = re.search(pattern, content)
+                for pattern in _DOC_INSERTION_RES:
+                    match = pattern.search(content)
                     if match:
                         insert_pos = match.start()
                         content = content[:insert_pos] + "\\begin{document}\n\n" + content[insert_pos:]
                         self.fixes_applied.append("Fixed: Added \\begin{document}")
+                        self._fix_count += 1
                         break
         
         # Check if \end{document} exists
-        if not re.search(r'\\end\{document\}', content):
+        if _END_DOC not in content:
             self.issues_found.append("Missing \\end{document}")
             if auto_fix:
                 content += "\n\\end{document}\n"
                 self.fixes_applied.append("Fixed: Added \\end{document}")
+                self._fix_count += 1
         
         return content
     
-    def _check_preamble_content(self, content: str, auto_fix: bool) -> str:
+    def _check_preamble_content(self, preamble: str, document_body: str, auto_fix: bool) -> Tuple[str, str]:
         """Check that preamble content appears before \begin{document}"""
         
-        begin_doc_match = re.search(r'\\begin\{document\}', content)
-        if not begin_doc_match:
-            return content
-        
-        begin_doc_pos = begin_doc_match.start()
-        preamble = content[:begin_doc_pos]
-        document_body = content[begin_doc_pos:]
-        
         # Check for content that should be in preamble but appears in document body
-        preamble_commands = [
-            r'\\documentclass',
-            r'\\usepackage',
-            r'\\newcommand',
-            r'\\renewcommand',
-            r'\\input\{[^}]*\.sty\}',
-            r'\\input\{[^}]*commands[^}]*\}'
-        ]
-        
+        # One pass over the body; each offending line is matched (and moved) once
         fixes_needed = []
-        for cmd_pattern in preamble_commands:
-            matches = list(re.finditer(cmd_pattern, document_body))
-            if matches:
-                for match in matches:
-                    line_start = document_body.rfind('\n', 0, match.start()) + 1
-                    line_end = document_body.find('\n', match.end())
-                    if line_end == -1:
-                        line_end = len(document_body)
-                    
-                    problematic_line = document_body[line_start:line_end]
-                    self.issues_found.append(f"Preamble command in document body: {problematic_line.strip()}")
-                    
-                    if auto_fix:
-                        fixes_needed.append((line_start, line_end, problematic_line))
+        for match in _PREAMBLE_CMD_LINE_RE.finditer(document_body):
+            problematic_line = match.group(0)
+            self.issues_found.append(f"Preamble command in document body: {problematic_line.strip()}")
+            
+            if auto_fix:
+                fixes_needed.append((match.start(), match.end(), problematic_line))
         
         # Apply fixes (move commands to preamble)
         if auto_fix and fixes_needed:
-            # Sort by position (reverse order to maintain positions)
-            fixes_needed.sort(key=lambda x: x[0], reverse=True)
-            
-            moved_commands = []
-            for line_start, line_end, line_content in fixes_needed:
-                # Remove from document body
-                document_body = document_body[:line_start] + document_body[line_end:]
-                moved_commands.append(line_content)
+            # Remove the lines from the document body in one splice
+            document_body = _splice(document_body, [(line_start, line_end, '') for line_start, line_end, _ in fixes_needed])
+            # Moved commands keep their historical (reverse document) order
+            moved_commands = [line_content for _, _, line_content in reversed(fixes_needed)]
             
             # Add to preamble
             preamble += '\n' + '\n'.join(moved_commands) + '\n'
-            content = preamble + document_body
             
             self.fixes_applied.append(f"Fixed: Moved {len(fixes_needed)} preamble commands")
+            self._fix_count += 1
         
-        return content
+        return preamble, document_body
     
-    def _check_title_author_placement(self, content: str, auto_fix: bool) -> str:
+    def _check_title_author_placement(self, preamble: str, document_body: str, auto_fix: bool) -> Tuple[str, str]:
         """Check that \title, \author are before \begin{document} and \maketitle is after"""
         
-        begin_doc_match = re.search(r'\\begin\{document\}', content)
-        if not begin_doc_match:
-            return content
-        
-        begin_doc_pos = begin_doc_match.start()
-        preamble = content[:begin_doc_pos]
-        document_body = content[begin_doc_pos:]
-        
         # Check for \title and \author in document body (should be in preamble)
-        title_in_body = re.search(r'\\title\{', document_body)
-        author_in_body = re.search(r'\\author\{', document_body)
-        
-        if title_in_body or author_in_body:
+        if '\\title{' in document_body or '\\author{' in document_body:
             self.issues_found.append("\\title or \\author found in document body (should be in preamble)")
             
             if auto_fix:
                 # Extract title and author from document body
-                title_match = re.search(r'\\title\{[^}]*\}', document_body)
-                author_match = re.search(r'\\author\{[^}]*\}', document_body)
+                title_match = _TITLE_CMD_RE.search(document_body)
+                author_match = _AUTHOR_CMD_RE.search(document_body)
                 
                 title_cmd = title_match.group(0) if title_match else ""
                 author_cmd = author_match.group(0) if author_match else ""
@@ -198,45 +212,38 @@ class LaTeXTemplateValidator:
                 if title_cmd or author_cmd:
                     preamble += f"\n{title_cmd}\n{author_cmd}\n"
                     self.fixes_applied.append("Fixed: Moved \\title and \\author to preamble")
+                    self._fix_count += 1
         
         # Check for \maketitle in preamble (should be in document body)
-        maketitle_in_preamble = re.search(r'\\maketitle', preamble)
-        if maketitle_in_preamble:
+        if _MAKETITLE in preamble:
             self.issues_found.append("\\maketitle found in preamble (should be in document body)")
             
             if auto_fix:
                 # Remove from preamble
-                preamble = re.sub(r'\\maketitle\s*', '', preamble)
+                preamble = _MAKETITLE_WS_RE.sub('', preamble)
                 
                 # Add to document body (after \begin{document})
-                begin_doc_line = re.search(r'\\begin\{document\}', document_body)
-                if begin_doc_line:
-                    insert_pos = begin_doc_line.end()
+                begin_doc_line = document_body.find(_BEGIN_DOC)
+                if begin_doc_line != -1:
+                    insert_pos = begin_doc_line + len(_BEGIN_DOC)
                     document_body = (document_body[:insert_pos] + 
                                    "\n\n\\maketitle\n" + 
                                    document_body[insert_pos:])
                     self.fixes_applied.append("Fixed: Moved \\maketitle to document body")
+                    self._fix_count += 1
         
-        return preamble + document_body
+        return preamble, document_body
     
-    def _check_abstract_placement(self, content: str, auto_fix: bool) -> str:
+    def _check_abstract_placement(self, preamble: str, document_body: str, auto_fix: bool) -> Tuple[str, str]:
         """Check that abstract is properly placed in document body"""
         
-        begin_doc_match = re.search(r'\\begin\{document\}', content)
-        if not begin_doc_match:
-            return content
-        
-        begin_doc_pos = begin_doc_match.start()
-        preamble = content[:begin_doc_pos]
-        
         # Check for abstract in preamble
-        abstract_in_preamble = re.search(r'\\begin\{abstract\}', preamble)
-        if abstract_in_preamble:
+        if '\\begin{abstract}' in preamble:
             self.issues_found.append("\\begin{abstract} found in preamble (should be in document body)")
             
             if auto_fix:
                 # Extract abstract from preamble
-                abstract_match = re.search(r'\\begin\{abstract\}.*?\\end\{abstract\}', preamble, re.DOTALL)
+                abstract_match = _ABSTRACT_BLOCK_RE.search(preamble)
                 if abstract_match:
                     abstract_content = abstract_match.group(0)
                     
@@ -244,30 +251,28 @@ class LaTeXTemplateValidator:
                     preamble = preamble.replace(abstract_content, "")
                     
                     # Add to document body (after \maketitle if present)
-                    document_body = content[begin_doc_pos:]
-                    maketitle_match = re.search(r'\\maketitle', document_body)
+                    maketitle_pos = document_body.find(_MAKETITLE)
                     
-                    if maketitle_match:
-                        insert_pos = begin_doc_pos + maketitle_match.end()
-                        content = (content[:insert_pos] + 
-                                 f"\n\n{abstract_content}\n" + 
-                                 content[insert_pos:])
+                    if maketitle_pos != -1:
+                        insert_pos = maketitle_pos + len(_MAKETITLE)
                     else:
                         # Insert after \begin{document}
-                        insert_pos = begin_doc_match.end()
-                        content = (content[:insert_pos] + 
-                                 f"\n\n{abstract_content}\n" + 
-                                 content[insert_pos:])
+                        begin_doc_pos = document_body.find(_BEGIN_DOC)
+                        insert_pos = begin_doc_pos + len(_BEGIN_DOC) if begin_doc_pos != -1 else 0
+                    document_body = (document_body[:insert_pos] + 
+                                     f"\n\n{abstract_content}\n" + 
+                                     document_body[insert_pos:])
                     
                     self.fixes_applied.append("Fixed: Moved abstract to document body")
+                    self._fix_count += 1
         
-        return content
+        return preamble, document_body
     
     def _check_bibliography_setup(self, content: str, auto_fix: bool) -> str:
         """Check bibliography setup and references"""
         
         # Check for \bibliography command
-        bib_command = re.search(r'\\bibliography\{([^}]+)\}', content)
+        bib_command = _BIBLIOGRAPHY_RE.search(content)
         if bib_command:
             bib_file = bib_command.group(1)
             
@@ -279,9 +284,10 @@ class LaTeXTemplateValidator:
                     content = content.replace(f'\\bibliography{{{bib_file}}}', 
                                            f'\\bibliography{{{new_bib_file}}}')
                     self.fixes_applied.append(f"Fixed: Removed .bib extension from bibliography command")
+                    self._fix_count += 1
         
         # Check for \bibliographystyle
-        if not re.search(r'\\bibliographystyle\{', content):
+        if '\\bibliographystyle{' not in content:
             self.issues_found.append("Missing \\bibliographystyle command")
             if auto_fix:
                 # Add before \bibliography if it exists, otherwise at end
@@ -293,71 +299,90 @@ class LaTeXTemplateValidator:
                 else:
                     content += "\n\\bibliographystyle{iclr2025}\n\\bibliography{references}\n"
                 self.fixes_applied.append("Fixed: Added \\bibliographystyle command")
+                self._fix_count += 1
         
         return content
     
     def _check_figure_references(self, content: str, auto_fix: bool) -> str:
         """Check for proper figure references and labels"""
         
-        # Find all \ref{} commands
-        ref_matches = re.findall(r'\\ref\{([^}]+)\}', content)
+        # One walk over the document collects \ref{}/\label{} names and rewrites figures;
+        # figure issues are reported after the undefined references, so they are held back
+        refs, labels = set(), set()
+        figure_issues = []
+        figure_count = 0
+        
+        def visit(match: re.Match) -> str:
+            if match.lastgroup == 'figure':
+                # References inside a figure are consumed with it: collect them from the block
+                for command, name in _REF_OR_LABEL_RE.findall(match.group(0)):
+                    (labels if command == 'label' else refs).add(name)
+                return label_figure(match)
+            (labels if match.group('xref') == 'label' else refs).add(match.group('name'))
+            return match.group(0)
+        
+        def label_figure(match: re.Match) -> str:
+            nonlocal figure_count
+            figure_count += 1
+            fig_block = match.group(0)
+            if '\\label{' in fig_block:
+                return fig_block
+            
+            figure_issues.append(f"Figure {figure_count} missing \\label command")
+            if not auto_fix:
+                return fig_block
+            
+            # Try to infer label from caption or use generic
+            caption_match = _CAPTION_RE.search(fig_block)
+            if caption_match:
+                # Create label from caption
+                caption = caption_match.group(1)
+                label = _LABEL_UNSAFE_RE.sub('_', caption.lower())[:20]
+                label = f"fig:{label}"
+            else:
+                label = f"fig:figure_{figure_count}"
+            
+            # Insert label after caption or at end of figure
+            if caption_match:
+                insert_pos = caption_match.end()
+                new_fig_block = (fig_block[:insert_pos] + 
+                               f"\n\\label{{{label}}}" + 
+                               fig_block[insert_pos:])
+            else:
+                # Insert before \end{figure}
+                new_fig_block = fig_block.replace("\\end{figure}", 
+                                                f"\\label{{{label}}}\n\\end{{figure}}")
+            
+            self.fixes_applied.append(f"Fixed: Added label {label} to figure {figure_count}")
+            self._fix_count += 1
+            return new_fig_block
         
-        # Find all \label{} commands
-        label_matches = re.findall(r'\\label\{([^}]+)\}', content)
+        content = _FIGURE_OR_XREF_RE.sub(visit, content)
         
         # Check for undefined references
-        undefined_refs = set(ref_matches) - set(label_matches)
+        undefined_refs = refs - labels
         if undefined_refs:
             for ref in undefined_refs:
                 self.issues_found.append(f"Undefined reference: {ref}")
         
         # Check for figures without labels
-        figure_blocks = re.findall(r'\\begin\{figure\}.*?\\end\{figure\}', content, re.DOTALL)
-        for i, fig_block in enumerate(figure_blocks):
-            if not re.search(r'\\label\{', fig_block):
-                self.issues_found.append(f"Figure {i+1} missing \\label command")
-                if auto_fix:
-                    # Try to infer label from caption or use generic
-                    caption_match = re.search(r'\\caption\{([^}]+)\}', fig_block)
-                    if caption_match:
-                        # Create label from caption
-                        caption = caption_match.group(1)
-                        label = re.sub(r'[^a-zA-Z0-9_]', '_', caption.lower())[:20]
-                        label = f"fig:{label}"
-                    else:
-                        label = f"fig:figure_{i+1}"
-                    
-                    # Insert label after caption or at end of figure
-                    if caption_match:
-                        insert_pos = fig_block.find(caption_match.group(0)) + len(caption_match.group(0))
-                        new_fig_block = (fig_block[:insert_pos] + 
-                                       f"\n\\label{{{label}}}" + 
-                                       fig_block[insert_pos:])
-                    else:
-                        # Insert before \end{figure}
-                        new_fig_block = fig_block.replace("\\end{figure}", 
-                                                        f"\\label{{{label}}}\n\\end{{figure}}")
-                    
-                    content = content.replace(fig_block, new_fig_block)
-                    self.fixes_applied.append(f"Fixed: Added label {label} to figure {i+1}")
+        self.issues_found.extend(figure_issues)
         
         return content
     
     def _check_section_structure(self, content: str, auto_fix: bool) -> str:
         """Check section hierarchy and structure"""
         
-        # Find all section commands
-        sections = re.findall(r'\\((?:sub)*section)\{([^}]+)\}', content)
-        
-        if not sections:
-            self.issues_found.append("No sections found in document")
-            return content
-        
         # Check for proper hierarchy
         section_levels = {'section': 1, 'subsection': 2, 'subsubsection': 3}
         prev_level = 0
         
-        for section_type, section_title in sections:
+        # Walk the section commands once; labels are collected and spliced in at the end
+        seen = {}
+        missing_labels = []
+        insertions = []
+        for match in _SECTION_RE.finditer(content):
+            section_type, section_title = match.group(1), match.group(2)
             current_level = section_levels.get(section_type, 1)
             
             # Check for skipped levels (e.g., section -> subsubsection)
@@ -365,28 +390,39 @@ class LaTeXTemplateValidator:
                 self.issues_found.append(f"Section hierarchy skip: {section_type} '{section_title}' after level {prev_level}")
             
             prev_level = current_level
-        
-        # Check for sections without labels
-        for section_type, section_title in sections:
-            section_pattern = f"\\\\{section_type}\\{{{re.escape(section_title)}\\}}"
-            section_match = re.search(section_pattern, content)
-            if section_match:
-                # Look for \label within next few lines
-                next_content = content[section_match.end():section_match.end()+200]
-                if not re.search(r'\\label\{', next_content):
-                    self.issues_found.append(f"Section '{section_title}' missing \\label")
+            
+            # A repeated command is judged by its first occurrence, which is labelled at most once
+            section_cmd = match.group(0)
+            if section_cmd in seen:
+                if seen[section_cmd] and not auto_fix:
+                    missing_labels.append(f"Section '{section_title}' missing \\label")
+                continue
+            
+            # Look for \label within next few lines (a bounded search, no slice copy)
+            section_end = match.end()
+            seen[section_cmd] = content.find('\\label{', section_end, section_end + 200) == -1
+            if seen[section_cmd]:
+                missing_labels.append(f"Section '{section_title}' missing \\label")
+                
+                if auto_fix:
+                    # Create label from section title
+                    label = _LABEL_UNSAFE_RE.sub('_', section_title.lower())
+                    label = f"sec:{label}"
                     
-                    if auto_fix:
-                        # Create label from section title
-                        label = re.sub(r'[^a-zA-Z0-9_]', '_', section_title.lower())
-                        label = f"sec:{label}"
-                        
-                        # Insert label after section command
-                        insert_pos = section_match.end()
-                        content = (content[:insert_pos] + 
-                                 f"\n\\label{{{label}}}" + 
-                                 content[insert_pos:])
-                        self.fixes_applied.append(f"Fixed: Added label {label} to section '{section_title}'")
+                    # Insert label after section command
+                    insertions.append((section_end, section_end, f"\n\\label{{{label}}}"))
+                    self.fixes_applied.append(f"Fixed: Added label {label} to section '{section_title}'")
+                    self._fix_count += 1
+        
+        if not seen:
+            self.issues_found.append("No sections found in document")
+            return content
+        
+        # Hierarchy issues are reported ahead of missing labels
+        self.issues_found.extend(missing_labels)
+        
+        if insertions:
+            content = _splice(content, insertions)
         
         return content
     
@@ -3,61 +3,117 @@ LaTeX Validation Prompts for LLM-generated writeups
 Helps guide LLMs to generate LaTeX that compiles successfully
 """
 
+import functools
+import mmap
 import os
 import re
-from typing import List, Dict, Set
+from heapq import nsmallest
+from typing import List, Dict, Set, Tuple, FrozenSet
+
+# Extensions of files usable with \includegraphics
+_FIGURE_SUFFIXES = ('.pdf', '.png', '.jpg', '.jpeg', '.eps')
+
+# BibTeX entry keys: @article{key,
+# The literal '@' prefix lets the regex engine jump between '@' bytes in C, which
+# already acts as the per-line prefilter; iterating lines in Python would be slower
+_BIB_KEY_RE = re.compile(rb'@[^{]*\{([^,]+),')
+
+# \ref{...} and \label{...} in one pattern: group 1 is the command, group 2 the name
+_REF_OR_LABEL_RE = re.compile(r'\\(ref|label)\{([^}]+)\}')
+
+# \cite{...}, \citep{...} and \citet{...}
+_CITE_RE = re.compile(r'\\cite[pt]?\{([^}]+)\}')
+
+# \includegraphics[options]{path}
+_INCLUDE_RE = re.compile(r'\\includegraphics(?:\[[^\]]*\])?\{([^}]+)\}')
+
+def _mtime_fingerprint(paths) -> Tuple[int, ...]:
+    """st_mtime_ns of each path (-1 if missing); a directory's changes whenever it gains or loses entries"""
+    fingerprint = []
+    for path in paths:
+        try:
+            fingerprint.append(os.stat(path).st_mtime_ns)
+        except OSError:
+            fingerprint.append(-1)
+    return tuple(fingerprint)
 
 def get_available_figures(base_folder: str) -> List[str]:
     """Get list of available figure files in the experiment folder"""
-    figures = []
-    
     # Check common figure locations
-    figure_dirs = [
+    figure_dirs = (
         os.path.join(base_folder, "figures"),
         os.path.join(base_folder, "plots"), 
         os.path.join(base_folder, "images"),
         base_folder  # Sometimes figures are in the root
-    ]
+    )
+    
+    # Rescan only when one of the directories changed since the last call
+    return list(_scan_figures(figure_dirs, _mtime_fingerprint(figure_dirs)))
+
+@functools.lru_cache(maxsize=64)
+def _scan_figures(figure_dirs: Tuple[str, ...], fingerprint: Tuple[int, ...]) -> Tuple[str, ...]:
+    """Sorted figure paths (relative to the latex directory) found in figure_dirs"""
+    figures = []
     
     for fig_dir in figure_dirs:
         if os.path.exists(fig_dir):
-            for file in os.listdir(fig_dir):
-                if file.lower().endswith(('.pdf', '.png', '.jpg', '.jpeg', '.eps')):
-                    # Store relative path from latex directory
-                    if fig_dir.endswith('figures'):
-                        figures.append(f"../figures/{file}")
-                    else:
-                        figures.append(f"../{os.path.basename(fig_dir)}/{file}")
-    
-    return sorted(figures)
+            with os.scandir(fig_dir) as entries:
+                for entry in entries:
+                    file = entry.name
+                    # Lowercase names are the norm: only fold case when the plain check fails
+                    if file.endswith(_FIGURE_SUFFIXES) or file.lower().endswith(_FIGURE_SUFFIXES):
+                        # Store relative path from latex directory
+                        if fig_dir.endswith('figures'):
+                            figures.append(f"../figures/{file}")
+                        else:
+                            figures.append(f"../{os.path.basename(fig_dir)}/{file}")
+    
+    return tuple(sorted(figures))
 
 def get_available_citations(base_folder: str) -> Set[str]:
     """Get list of available citations from bibliography files"""
-    citations = set()
+    latex_dir = os.path.join(base_folder, "latex")
+    bib_files = _find_bib_files(base_folder, _mtime_fingerprint((base_folder, latex_dir)))
     
+    # Re-parse only when a bibliography file changed since the last call
+    bib_signature = []
+    for bib_file in bib_files:
+        try:
+            st = os.stat(bib_file)
+        except OSError:
+            continue
+        bib_signature.append((bib_file, st.st_mtime_ns, st.st_size))
+    return set(_read_citations(tuple(bib_signature)))
+
+@functools.lru_cache(maxsize=64)
+def _find_bib_files(base_folder: str, fingerprint: Tuple[int, ...]) -> Tuple[str, ...]:
+    """Paths of the .bib files in base_folder and its latex/ subdirectory"""
     # Check for bibliography files
-    bib_files = []
-    for file in os.listdir(base_folder):
-        if file.endswith('.bib'):
-            bib_files.append(os.path.join(base_folder, file))
+    with os.scandir(base_folder) as entries:
+        bib_files = [entry.path for entry in entries if entry.name.endswith('.bib')]
     
     # Also check latex directory
     latex_dir = os.path.join(base_folder, "latex")
     if os.path.exists(latex_dir):
-        for file in os.listdir(latex_dir):
-            if file.endswith('.bib'):
-                bib_files.append(os.path.join(latex_dir, file))
+        with os.scandir(latex_dir) as entries:
+            bib_files.extend(entry.path for entry in entries if entry.name.endswith('.bib'))
+    
+    return tuple(bib_files)
+
+@functools.lru_cache(maxsize=64)
+def _read_citations(bib_signature: Tuple[Tuple[str, int, int], ...]) -> FrozenSet[str]:
+    """Citation keys defined in the given (path, mtime_ns, size) bibliography files"""
+    citations = set()
     
     # Extract citations from bib files
-    for bib_file in bib_files:
-        if os.path.exists(bib_file):
-            with open(bib_file, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
+    for bib_file, _, size in bib_signature:
+        if size > 0:
+            # Scan the mapped bytes directly and decode only the keys
+            with open(bib_file, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
                 # Find citation keys
-                matches = re.findall(r'@[^{]*\{([^,]+),', content)
-                citations.update(matches)
+                citations.update(key.decode('utf-8', 'ignore') for key in _BIB_KEY_RE.findall(content))
     
-    return citations
+    return frozenset(citations)
 
 def create_latex_validation_prompt(base_folder: str) -> str:
     """Create a validation prompt to guide LLM LaTeX generation"""
@@ -65,44 +121,45 @@ def create_latex_validation_prompt(base_folder: str) -> str:
     available_figures = get_available_figures(base_folder)
     available_citations = get_available_citations(base_folder)
     
-    prompt = f"""
+    parts = [f"""
 IMPORTANT LATEX GENERATION CONSTRAINTS:
 
 1. AVAILABLE FIGURES ({len(available_figures)} files found):
-"""
+"""]
     
     if available_figures:
-        prompt += "   ONLY use these figure files that actually exist:\n"
+        parts.append("   ONLY use these figure files that actually exist:\n")
         for i, fig in enumerate(available_figures[:10], 1):  # Limit to first 10
-            prompt += f"   - Figure{i}: {fig}\n"
+            parts.append(f"   - Figure{i}: {fig}\n")
         if len(available_figures) > 10:
-            prompt += f"   - ... and {len(available_figures) - 10} more\n"
+            parts.append(f"   - ... and {len(available_figures) - 10} more\n")
         
-        prompt += f"""
+        parts.append(f"""
    Usage: \\includegraphics[width=0.45\\textwidth]{{{available_figures[0]}}}
    
-"""
+""")
     else:
-        prompt += "   ⚠️  NO FIGURE FILES FOUND - DO NOT include any \\includegraphics commands\n\n"
+        parts.append("   ⚠️  NO FIGURE FILES FOUND - DO NOT include any \\includegraphics commands\n\n")
     
-    prompt += f"2. AVAILABLE CITATIONS ({len(available_citations)} found):\n"
+    parts.append(f"2. AVAILABLE CITATIONS ({len(available_citations)} found):\n")
     
     if available_citations:
-        prompt += "   ONLY cite these references that exist in the bibliography:\n"
-        citation_list = sorted(list(available_citations))
+        parts.append("   ONLY cite these references that exist in the bibliography:\n")
+        # Only the first 15 (plus the usage example) are shown: no need to sort every key
+        citation_list = nsmallest(16, available_citations)
         for cite in citation_list[:15]:  # Limit to first 15
-            prompt += f"   - {cite}\n"
+            parts.append(f"   - {cite}\n")
         if len(available_citations) > 15:
-            prompt += f"   - ... and {len(available_citations) - 15} more\n"
+            parts.append(f"   - ... and {len(available_citations) - 15} more\n")
         
-        prompt += f"""
+        parts.append(f"""
    Usage: \\cite{{{citation_list[0]}}} or \\citep{{{citation_list[0]}}}
    
-"""
+""")
     else:
-        prompt += "   ⚠️  NO CITATIONS FOUND - DO NOT include any \\cite commands\n\n"
+        parts.append("   ⚠️  NO CITATIONS FOUND - DO NOT include any \\cite commands\n\n")
     
-    prompt += """3. LATEX REQUIREMENTS:
+    parts.append("""3. LATEX REQUIREMENTS:
    - Use \\usepackage{iclr2025,times} (NOT iclr2025_icbinb)
    - Graphics path is set to ../figures/ 
    - All figures must be referenced with \\label{fig:name} and \\ref{fig:name}
@@ -116,9 +173,9 @@ IMPORTANT LATEX GENERATION CONSTRAINTS:
    - Keep figure numbering sequential (Figure1, Figure2, etc.)
 
 CRITICAL: Only reference files and citations that actually exist. The LaTeX compiler will fail if you reference missing files.
-"""
+""")
     
-    return prompt
+    return ''.join(parts)
 
 def validate_generated_latex(latex_content: str, base_folder: str) -> Dict[str, List[str]]:
     """Validate generated LaTeX content against available resources"""
@@ -129,28 +186,25 @@ def validate_generated_latex(latex_content: str, base_folder: str) -> Dict[str,
         'warnings': []
     }
     
-    available_figures = get_available_figures(base_folder)
+    available_figures = frozenset(get_available_figures(base_folder))
     available_citations = get_available_citations(base_folder)
     
     # Extract figure references from LaTeX
-    figure_refs = re.findall(r'\\includegraphics(?:\[[^\]]*\])?\{([^}]+)\}', latex_content)
-    for fig_ref in figure_refs:
+    for fig_ref in _INCLUDE_RE.findall(latex_content):
         if fig_ref not in available_figures:
             issues['missing_figures'].append(fig_ref)
     
     # Extract citation references
-    cite_patterns = [r'\\cite\{([^}]+)\}', r'\\citep\{([^}]+)\}', r'\\citet\{([^}]+)\}']
-    for pattern in cite_patterns:
-        cite_refs = re.findall(pattern, latex_content)
-        for cite_ref in cite_refs:
-            citations = [c.strip() for c in cite_ref.split(',')]
-            for citation in citations:
-                if citation not in available_citations:
-                    issues['missing_citations'].append(citation)
+    for cite_ref in _CITE_RE.findall(latex_content):
+        for citation in cite_ref.split(','):
+            citation = citation.strip()
+            if citation not in available_citations:
+                issues['missing_citations'].append(citation)
     
     # Check for undefined references
-    label_refs = set(re.findall(r'\\ref\{([^}]+)\}', latex_content))
-    label_defs = set(re.findall(r'\\label\{([^}]+)\}', latex_content))
+    label_refs, label_defs = set(), set()
+    for command, name in _REF_OR_LABEL_RE.findall(latex_content):
+        (label_defs if command == 'label' else label_refs).add(name)
     undefined_refs = label_refs - label_defs
     if undefined_refs:
         issues['undefined_refs'] = list(undefined_refs)
@@ -162,33 +216,33 @@ def create_latex_feedback_prompt(issues: Dict[str, List[str]]) -> str:
     if not any(issues.values()):
         return "✅ LaTeX validation passed - no issues found!"
     
-    feedback = "❌ LATEX VALIDATION FAILED - Please fix these issues:\n\n"
+    parts = ["❌ LATEX VALIDATION FAILED - Please fix these issues:\n\n"]
     
     if issues['missing_figures']:
-        feedback += f"🖼️  MISSING FIGURES ({len(issues['missing_figures'])}):\n"
+        parts.append(f"🖼️  MISSING FIGURES ({len(issues['missing_figures'])}):\n")
         for fig in issues['missing_figures'][:5]:
-            feedback += f"   - {fig} (file does not exist)\n"
+            parts.append(f"   - {fig} (file does not exist)\n")
         if len(issues['missing_figures']) > 5:
-            feedback += f"   - ... and {len(issues['missing_figures']) - 5} more\n"
-        feedback += "   Fix: Remove these \\includegraphics references or use available figures\n\n"
+            parts.append(f"   - ... and {len(issues['missing_figures']) - 5} more\n")
+        parts.append("   Fix: Remove these \\includegraphics references or use available figures\n\n")
     
     if issues['missing_citations']:
-        feedback += f"📚 MISSING CITATIONS ({len(issues['missing_citations'])}):\n"
+        parts.append(f"📚 MISSING CITATIONS ({len(issues['missing_citations'])}):\n")
         for cite in issues['missing_citations'][:5]:
-            feedback += f"   - {cite} (not in bibliography)\n"
+            parts.append(f"   - {cite} (not in bibliography)\n")
         if len(issues['missing_citations']) > 5:
-            feedback += f"   - ... and {len(issues['missing_citations']) - 5} more\n"
-        feedback += "   Fix: Remove these \\cite references or add to bibliography\n\n"
+            parts.append(f"   - ... and {len(issues['missing_citations']) - 5} more\n")
+        parts.append("   Fix: Remove these \\cite references or add to bibliography\n\n")
     
     if issues['undefined_refs']:
-        feedback += f"🏷️  UNDEFINED REFERENCES ({len(issues['undefined_refs'])}):\n"
+        parts.append(f"🏷️  UNDEFINED REFERENCES ({len(issues['undefined_refs'])}):\n")
         for ref in issues['undefined_refs'][:5]:
-            feedback += f"   - \\ref{{{ref}}} (no corresponding \\label{{{ref}}})\n"
-        feedback += "   Fix: Add \\label{} commands or remove \\ref{} references\n\n"
+            parts.append(f"   - \\ref{{{ref}}} (no corresponding \\label{{{ref}}})\n")
+        parts.append("   Fix: Add \\label{} commands or remove \\ref{} references\n\n")
     
-    feedback += "Please regenerate the LaTeX with these issues fixed."
+    parts.append("Please regenerate the LaTeX with these issues fixed.")
     
-    return feedback
+    return ''.join(parts)
 
 # Example usage functions
 def get_writeup_constraints_prompt(base_folder: str) -> str:
@@ -3,28 +3,94 @@
 Setup script to configure LaTeX properly in conda environment
 """
 
+import functools
 import os
+import shlex
+import shutil
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
+
+# Candidate LaTeX bin directories, in order of preference
+_LATEX_PATHS = (
+    "/Users/lirenw/Library/TinyTeX/bin/universal-darwin",
+    "/usr/local/texlive/2023/bin/universal-darwin",
+    "/usr/local/texlive/2024/bin/universal-darwin", 
+    "/usr/local/texlive/2025/bin/universal-darwin",
+    "/usr/local/bin",
+    "/opt/homebrew/bin"
+)
+
+# Tools the setup must make reachable
+_LATEX_TOOLS = ('pdflatex', 'tlmgr', 'bibtex')
+
+# conda activate.d / deactivate.d hooks that put LaTeX on PATH and take it off again
+_ACTIVATE_SCRIPT = """#!/bin/bash
+# Add LaTeX to PATH when activating conda environment
+export LATEX_PATH_BACKUP="$PATH"
+export PATH="{latex_path}:$PATH"
+echo "🔧 Added LaTeX to PATH: {latex_path}"
+"""
+_DEACTIVATE_SCRIPT = b"""#!/bin/bash
+# Restore original PATH when deactivating conda environment
+if [ ! -z "$LATEX_PATH_BACKUP" ]; then
+    export PATH="$LATEX_PATH_BACKUP"
+    unset LATEX_PATH_BACKUP
+fi
+"""
+
+# Thin launchers placed in $CONDA_PREFIX/bin: the main tools work without any activate hook
+_WRAPPED_TOOLS = ('pdflatex', 'bibtex', 'tlmgr', 'latexmk')
+_WRAPPER_MARKER = "# LaTeX launcher written by setup_latex_conda.py"
+_WRAPPER_SCRIPT = """#!/bin/sh
+{marker}
+exec "{tool_path}" "$@"
+"""
+
+def _write_executable(path, data):
+    """Write data to path as an executable script (mode set at creation, no separate chmod)"""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o755)
+    try:
+        os.write(fd, data)
+    finally:
+        os.close(fd)
+
+def _install_wrapper(bin_dir, latex_path, tool):
+    """Write bin_dir/tool exec'ing latex_path/tool; returns its path, or None if skipped"""
+    tool_path = os.path.join(latex_path, tool)
+    if not os.access(tool_path, os.X_OK):
+        return None
+    
+    wrapper = os.path.join(bin_dir, tool)
+    # Never replace a real executable the environment already provides
+    try:
+        with open(wrapper, 'rb') as f:
+            if _WRAPPER_MARKER.encode('utf-8') not in f.read(256):
+                return None
+    except FileNotFoundError:
+        pass
+    
+    _write_executable(wrapper, _WRAPPER_SCRIPT.format(marker=_WRAPPER_MARKER, tool_path=tool_path).encode('utf-8'))
+    return wrapper
 
 def find_latex_installation():
     """Find LaTeX installation on macOS"""
-    latex_paths = [
-        "/Users/lirenw/Library/TinyTeX/bin/universal-darwin",
-        "/usr/local/texlive/2023/bin/universal-darwin",
-        "/usr/local/texlive/2024/bin/universal-darwin", 
-        "/usr/local/texlive/2025/bin/universal-darwin",
-        "/usr/local/bin",
-        "/opt/homebrew/bin"
-    ]
-    
-    for path in latex_paths:
-        if os.path.exists(path):
-            pdflatex = os.path.join(path, 'pdflatex')
-            tlmgr = os.path.join(path, 'tlmgr')
-            if os.path.exists(pdflatex):
-                print(f"✅ Found LaTeX installation: {path}")
-                return path
+    # The probe result is reused until PATH changes (main and update_conda_environment both ask)
+    path = _find_latex_cached(os.environ.get('PATH', ''))
+    if path:
+        print(f"✅ Found LaTeX installation: {path}")
+    return path
+
+@functools.lru_cache(maxsize=4)
+def _find_latex_cached(path_env):
+    """First candidate directory holding pdflatex (path_env only keys the cache)"""
+    for path in _LATEX_PATHS:
+        # One stat of pdflatex answers both "does the directory exist" and "is LaTeX here"
+        try:
+            os.stat(os.path.join(path, 'pdflatex'))
+        except OSError:
+            continue
+        return path
     
     return None
 
@@ -51,39 +117,32 @@ def update_conda_environment():
     deactivate_dir = os.path.join(conda_prefix, 'etc', 'conda', 'deactivate.d')
     
     # Create directories if they don't exist
-    os.makedirs(activate_dir, exist_ok=True)
-    os.makedirs(deactivate_dir, exist_ok=True)
+    for directory in (activate_dir, deactivate_dir):
+        try:
+            os.makedirs(directory)
+        except FileExistsError:
+            pass
     
     # Create activation script
     activate_script = os.path.join(activate_dir, 'latex_path.sh')
-    with open(activate_script, 'w') as f:
-        f.write(f"""#!/bin/bash
-# Add LaTeX to PATH when activating conda environment
-export LATEX_PATH_BACKUP="$PATH"
-export PATH="{latex_path}:$PATH"
-echo "🔧 Added LaTeX to PATH: {latex_path}"
-""")
-    
-    # Make it executable
-    os.chmod(activate_script, 0o755)
+    _write_executable(activate_script, _ACTIVATE_SCRIPT.format(latex_path=latex_path).encode('utf-8'))
     
     # Create deactivation script
     deactivate_script = os.path.join(deactivate_dir, 'latex_path.sh')
-    with open(deactivate_script, 'w') as f:
-        f.write("""#!/bin/bash
-# Restore original PATH when deactivating conda environment
-if [ ! -z "$LATEX_PATH_BACKUP" ]; then
-    export PATH="$LATEX_PATH_BACKUP"
-    unset LATEX_PATH_BACKUP
-fi
-""")
-    
-    # Make it executable
-    os.chmod(deactivate_script, 0o755)
+    _write_executable(deactivate_script, _DEACTIVATE_SCRIPT)
     
     print(f"✅ Created activation script: {activate_script}")
     print(f"✅ Created deactivation script: {deactivate_script}")
     
+    # Launchers for the main tools in the environment's bin/, which is on PATH
+    # without running any activate hook (e.g. `conda run` or the env's python directly)
+    bin_dir = os.path.join(conda_prefix, 'bin')
+    if os.path.isdir(bin_dir):
+        for tool in _WRAPPED_TOOLS:
+            wrapper = _install_wrapper(bin_dir, latex_path, tool)
+            if wrapper:
+                print(f"✅ Created launcher: {wrapper}")
+    
     # Update current session PATH
     current_path = os.environ.get("PATH", "")
     if latex_path not in current_path:
@@ -92,23 +151,78 @@ fi
     
     return True
 
-def test_latex_access():
-    """Test if LaTeX tools are accessible"""
-    tools = ['pdflatex', 'tlmgr', 'bibtex']
+@functools.lru_cache(maxsize=4)
+def _resolve_tools(tools, path_env):
+    """Absolute path (or None) of each tool on the given PATH, resolved once per PATH value"""
+    return {tool: shutil.which(tool, path=path_env) for tool in tools}
+
+def _probe_tool(executable):
+    """Run `<executable> --version`, returning the CompletedProcess or None if it could not run"""
+    # Only the exit status is used: with the output discarded, an absolute executable and
+    # close_fds=False (our fds are non-inheritable anyway), subprocess launches the child
+    # through posix_spawn instead of fork + exec
+    try:
+        return subprocess.run([executable, '--version'], 
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                              close_fds=False, timeout=10)
+    except (subprocess.SubprocessError, FileNotFoundError, subprocess.TimeoutExpired):
+        return None
+
+def quick_check_latex_tools(latex_path):
+    """Cheap check that latex_path is on PATH and holds executable LaTeX tools (no subprocesses)"""
+    if latex_path not in os.environ.get("PATH", "").split(os.pathsep):
+        return False
+    return all(os.access(os.path.join(latex_path, tool), os.X_OK) for tool in _LATEX_TOOLS)
+
+def _probe_tools_in_shell(executables):
+    """Run every `<executable> --version` from one sh process; maps tool to return code (None if unknown)"""
+    script = '; '.join(f'{shlex.quote(executable)} --version >/dev/null 2>&1; echo "{tool} $?"'
+                       for tool, executable in executables.items())
+    return_codes = dict.fromkeys(executables)
+    try:
+        result = subprocess.run(['sh', '-c', script], capture_output=True, text=True,
+                                timeout=10 * len(executables))
+    except (subprocess.SubprocessError, FileNotFoundError, subprocess.TimeoutExpired):
+        return return_codes
+    for line in result.stdout.splitlines():
+        tool, _, code = line.rpartition(' ')
+        if tool in return_codes and code.isdigit():
+            return_codes[tool] = int(code)
+    return return_codes
+
+def test_latex_access(concurrent=True):
+    """Test if LaTeX tools are accessible (concurrent=False: one shared sh process instead of parallel probes)"""
+    tools = _LATEX_TOOLS
     success = True
     
+    resolved = _resolve_tools(tools, os.environ.get("PATH", ""))
+    executables = {tool: resolved[tool] for tool in tools if resolved[tool]}
+    
+    if not executables:
+        return_codes = {}
+    elif concurrent:
+        # The --version probes are independent: start them together, report in order
+        with ThreadPoolExecutor(max_workers=len(executables)) as executor:
+            futures = {tool: executor.submit(_probe_tool, executable)
+                       for tool, executable in executables.items()}
+        return_codes = {tool: getattr(future.result(), 'returncode', None) for tool, future in futures.items()}
+    elif os.name == 'posix':
+        return_codes = _probe_tools_in_shell(executables)
+    else:
+        # No sh to batch into: probe one by one
+        return_codes = {tool: getattr(_probe_tool(executable), 'returncode', None)
+                        for tool, executable in executables.items()}
+    
     for tool in tools:
-        try:
-            result = subprocess.run([tool, '--version'], 
-                                  capture_output=True, text=True, timeout=10)
-            if result.returncode == 0:
-                print(f"✅ {tool} is accessible")
-            else:
-                print(f"❌ {tool} failed with return code {result.returncode}")
-                success = False
-        except (subprocess.SubprocessError, FileNotFoundError, subprocess.TimeoutExpired):
+        returncode = return_codes.get(tool)
+        if returncode is None:
             print(f"❌ {tool} not found or not working")
             success = False
+        elif returncode == 0:
+            print(f"✅ {tool} is accessible")
+        else:
+            print(f"❌ {tool} failed with return code {returncode}")
+            success = False
     
     return success
 
@@ -137,8 +251,14 @@ def main():
     
     # Update conda environment
     if update_conda_environment():
-        print("\n🔄 Testing LaTeX access...")
-        if test_latex_access():
+        # The tools were just located on disk: only spawn the --version probes if that is not enough
+        if quick_check_latex_tools(latex_path):
+            print(f"\n✅ LaTeX tools found on PATH: {latex_path}")
+            tools_ok = True
+        else:
+            print("\n🔄 Testing LaTeX access...")
+            tools_ok = test_latex_access()
+        if tools_ok:
             print("\n✅ LaTeX setup complete!")
             print("🔄 Please restart your conda environment to apply changes:")
             print("   conda deactivate")
@@ -0,0 +1,49 @@
+"""
+Start and stop the NVIDIA MPS control daemon shared by concurrent launcher runs
+"""
+
+import os
+import subprocess
+
+# The MPS control daemon creates its control pipe here while it runs
+_MPS_PIPE_DIRECTORY = os.environ.get("CUDA_MPS_PIPE_DIRECTORY", "/tmp/nvidia-mps")
+# Serializes daemon startup between launchers started together on one machine
+_MPS_LOCK_PATH = "/tmp/ai_scientist_mps.lock"
+
+# Whether this process started the daemon, and so should stop it again
+_started_daemon = False
+
+
+def ensure_mps_daemon() -> bool:
+    """Start the NVIDIA MPS control daemon unless it is already running; returns whether it is up"""
+    global _started_daemon
+    import fcntl
+    with open(_MPS_LOCK_PATH, "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        if os.path.exists(os.path.join(_MPS_PIPE_DIRECTORY, "control")):
+            return True
+        try:
+            # -d forks the daemon into the background and returns straight away
+            subprocess.run(["nvidia-cuda-mps-control", "-d"], capture_output=True, check=True, timeout=10)
+        except (subprocess.SubprocessError, FileNotFoundError) as e:
+            print(f"⚠️  Could not start the MPS control daemon: {e}")
+            return False
+        _started_daemon = True
+    print("🎮 Started the MPS control daemon")
+    return True
+
+
+def stop_mps_daemon() -> None:
+    """Quit the MPS control daemon if this process started it; a no-op otherwise"""
+    global _started_daemon
+    if not _started_daemon:
+        return
+    _started_daemon = False
+    try:
+        # The daemon stops taking new clients and exits once the running ones finish
+        subprocess.run(["nvidia-cuda-mps-control"], input="quit\n", text=True,
+                       capture_output=True, check=True, timeout=30)
+    except (subprocess.SubprocessError, FileNotFoundError) as e:
+        print(f"⚠️  Could not stop the MPS control daemon: {e}")
+        return
+    print("🎮 Stopped the MPS control daemon")
@@ -0,0 +1,44 @@
+import os
+import os.path as osp
+import re
+
+# Reflection number in names like paper_reflection_3.pdf or paper_reflection.2.pdf
+_REFLECTION_RE = re.compile(r"reflection[_.]?(\d+)")
+
+
+def find_pdf_path_for_review(idea_dir):
+    """Find the most recent PDF file for review"""
+    # One pass over the directory keeps the best candidate of each kind
+    best_final = None
+    best_numbered = None
+    max_n = -1
+    first_reflection = None
+    first_pdf = None
+
+    # scandir streams the names without building a list; only the chosen one is joined
+    with os.scandir(idea_dir) as entries:
+        for entry in entries:
+            f = entry.name
+            if not f.endswith(".pdf"):
+                continue
+            if "reflection" not in f:
+                if first_pdf is None:
+                    first_pdf = f
+                continue
+
+            if first_reflection is None:
+                first_reflection = f
+            # A final version wins outright
+            if best_final is None and "final" in f.lower():
+                best_final = f
+            # Otherwise keep the file with the highest reflection number (first one on ties)
+            match = _REFLECTION_RE.search(f)
+            if match:
+                n = int(match.group(1))
+                if n > max_n:
+                    max_n = n
+                    best_numbered = f
+
+    # Fall back to the first reflection PDF if no numbers found, then to any available PDF
+    pdf_name = best_final or best_numbered or first_reflection or first_pdf
+    return osp.join(idea_dir, pdf_name) if pdf_name is not None else None
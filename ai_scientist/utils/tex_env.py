@@ -0,0 +1,44 @@
+"""
+Locate the TeX installation once per process instead of on every call
+"""
+
+import functools
+import os
+import shutil
+from typing import Optional, Tuple
+
+# TinyTeX's default bin directory on macOS
+_TINYTEX_BIN = "~/Library/TinyTeX/bin/universal-darwin"
+
+
+@functools.lru_cache(maxsize=1)
+def tinytex_prefix() -> Optional[str]:
+    """TinyTeX bin directory if it is installed, else None (a miss is remembered too)"""
+    path = os.path.expanduser(_TINYTEX_BIN)
+    return path if os.path.exists(path) else None
+
+
+def pdflatex_path() -> Optional[str]:
+    """Absolute path of pdflatex on the current PATH, or None"""
+    # The PATH search is repeated only if PATH itself changed since the last lookup
+    return _which_pdflatex(os.environ.get("PATH", ""))
+
+
+@functools.lru_cache(maxsize=1)
+def _which_pdflatex(path_env: str) -> Optional[str]:
+    return shutil.which("pdflatex", path=path_env)
+
+
+@functools.lru_cache(maxsize=8)
+def existing_paths(paths: Tuple[str, ...]) -> Tuple[str, ...]:
+    """The entries of paths that exist, checked once per tuple of candidates"""
+    return tuple(path for path in paths if os.path.exists(path))
+
+
+def prepend_to_path(directory: str) -> bool:
+    """Put directory at the front of PATH unless it is already on it; returns whether PATH changed"""
+    current_path = os.environ.get("PATH", "")
+    if directory in current_path.split(os.pathsep):
+        return False
+    os.environ["PATH"] = f"{directory}{os.pathsep}{current_path}"
+    return True
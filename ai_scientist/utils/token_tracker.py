@@ -5,6 +5,7 @@ from collections import defaultdict
 import asyncio
 from datetime import datetime
 import logging
+import threading
 
 
 class TokenTracker:
@@ -21,6 +22,9 @@ class TokenTracker:
             lambda: {"prompt": 0, "completion": 0, "reasoning": 0, "cached": 0}
         )
         self.interactions = defaultdict(list)
+        # LLM calls run on several threads at once (citations beside plot aggregation,
+        # concurrent reviews); updates and snapshots happen under this lock
+        self._lock = threading.Lock()
 
         self.MODEL_PRICES = {
             "gpt-4o-2024-11-20": {
@@ -67,10 +71,11 @@ class TokenTracker:
         reasoning_tokens: int,
         cached_tokens: int,
     ):
-        self.token_counts[model]["prompt"] += prompt_tokens
-        self.token_counts[model]["completion"] += completion_tokens
-        self.token_counts[model]["reasoning"] += reasoning_tokens
-        self.token_counts[model]["cached"] += cached_tokens
+        with self._lock:
+            self.token_counts[model]["prompt"] += prompt_tokens
+            self.token_counts[model]["completion"] += completion_tokens
+            self.token_counts[model]["reasoning"] += reasoning_tokens
+            self.token_counts[model]["cached"] += cached_tokens
 
     def add_interaction(
         self,
@@ -81,20 +86,22 @@ class TokenTracker:
         timestamp: datetime,
     ):
         """Record a single interaction with the model."""
-        self.interactions[model].append(
-            {
-                "system_message": system_message,
-                "prompt": prompt,
-                "response": response,
-                "timestamp": timestamp,
-            }
-        )
+        with self._lock:
+            self.interactions[model].append(
+                {
+                    "system_message": system_message,
+                    "prompt": prompt,
+                    "response": response,
+                    "timestamp": timestamp,
+                }
+            )
 
     def get_interactions(self, model: Optional[str] = None) -> Dict[str, List[Dict]]:
         """Get all interactions, optionally filtered by model."""
-        if model:
-            return {model: self.interactions[model]}
-        return dict(self.interactions)
+        with self._lock:
+            if model:
+                return {model: list(self.interactions[model])}
+            return {m: list(entries) for m, entries in self.interactions.items()}
 
     def reset(self):
         """Reset all token counts and interactions."""
@@ -128,9 +135,11 @@ class TokenTracker:
         # return dict(self.token_counts)
         """Get summary of token usage and costs for all models."""
         summary = {}
-        for model, tokens in self.token_counts.items():
+        with self._lock:
+            token_counts = {model: tokens.copy() for model, tokens in self.token_counts.items()}
+        for model, tokens in token_counts.items():
             summary[model] = {
-                "tokens": tokens.copy(),
+                "tokens": tokens,
                 "cost (USD)": self.calculate_cost(model),
             }
         return summary
@@ -7,92 +7,162 @@ while preserving valuable experimental data and citations.
 
 import os
 import sys
-import shutil
-import glob
+import fnmatch
+import io
+import re
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 
-def cleanup_experiment(experiment_dir, verbose=True, regenerate_citations=False):
-    """Clean up an experiment directory for re-run"""
+# Files to remove, matched on entry names during one directory read each
+# LaTeX auxiliary files (can cause stale references): latex/*<ext>
+_LATEX_AUX_SUFFIXES = ('.aux', '.bbl', '.blg', '.log', '.out', '.fls', '.fdb_latexmk', '.synctex.gz')
+_LATEX_GENERATED_NAMES = (
+    # Bibliography files (will be regenerated from cached_citations.bib)
+    "references.bib",
+    # Corrupted templates (will be regenerated)
+    "template.tex",
+)
+_TOP_LEVEL_FILE_PATTERNS = (
+    # Generated PDFs (will be regenerated with fixes)
+    "*.pdf",
+    # Reflection artifacts (will be regenerated)
+    "*_reflection*_imgs",
+)
+# Citation cache, removed only to force complete regeneration
+_CITATION_CACHE_PATTERNS = (
+    "cached_citations.bib",
+    "citations_progress.json",
+)
+# Directories to remove
+_DIR_PATTERNS = (
+    # Reflection image directories
+    "*_reflection*_imgs",
+)
+
+def _union_pattern(patterns):
+    """One compiled alternation matching a name against any of the wildcard patterns"""
+    return re.compile('|'.join(fnmatch.translate(pattern) for pattern in patterns))
+
+# Each directory's patterns folded into a single regex: one match per entry name
+_LATEX_FILE_RE = _union_pattern(tuple('*' + suffix for suffix in _LATEX_AUX_SUFFIXES) + _LATEX_GENERATED_NAMES)
+_TOP_LEVEL_FILE_RE = _union_pattern(_TOP_LEVEL_FILE_PATTERNS)
+_TOP_LEVEL_FILE_WITH_CACHE_RE = _union_pattern(_TOP_LEVEL_FILE_PATTERNS + _CITATION_CACHE_PATTERNS)
+_DIR_RE = _union_pattern(_DIR_PATTERNS)
+
+def _list_dir(directory):
+    """Entries of directory (empty if it cannot be read), from a single scandir"""
+    try:
+        with os.scandir(directory) as entries:
+            return list(entries)
+    except OSError:
+        return []
+
+def _remove_tree(path):
+    """Remove a directory tree, using each entry's dirent type instead of an lstat to decide recursion"""
+    with os.scandir(path) as entries:
+        entries = list(entries)
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            _remove_tree(entry.path)
+        else:
+            os.unlink(entry.path)
+    os.rmdir(path)
+
+# Records the directory state a successful cleanup left behind (hidden, so never cleaned itself)
+_SENTINEL_NAME = ".last_cleanup"
+
+def _cleanup_fingerprint(experiment_dir):
+    """mtimes of the experiment directory and its latex/ (-1 if missing): both change when entries come or go"""
+    fingerprint = []
+    for directory in (experiment_dir, os.path.join(experiment_dir, "latex")):
+        try:
+            fingerprint.append(os.stat(directory).st_mtime_ns)
+        except OSError:
+            fingerprint.append(-1)
+    return fingerprint
+
+def _is_already_clean(experiment_dir, regenerate_citations):
+    """Whether nothing was added or removed since a cleanup at least as thorough as this one"""
+    try:
+        with open(os.path.join(experiment_dir, _SENTINEL_NAME)) as f:
+            *fingerprint, citations_removed = (int(field) for field in f.read().split())
+    except (OSError, ValueError):
+        return False
+    return fingerprint == _cleanup_fingerprint(experiment_dir) and (citations_removed or not regenerate_citations)
+
+def _record_cleanup(experiment_dir, regenerate_citations):
+    """Write the sentinel; it is created before the fingerprint is taken, so its own entry is included"""
+    sentinel = os.path.join(experiment_dir, _SENTINEL_NAME)
+    try:
+        open(sentinel, 'a').close()
+        fields = _cleanup_fingerprint(experiment_dir) + [int(regenerate_citations)]
+        with open(sentinel, 'w') as f:
+            f.write(' '.join(map(str, fields)))
+    except OSError:
+        pass
+
+def cleanup_experiment(experiment_dir, verbose=True, regenerate_citations=False, out=None):
+    """Clean up an experiment directory for re-run (progress goes to out, default stdout)"""
     
     if not os.path.exists(experiment_dir):
-        print(f"❌ Experiment directory not found: {experiment_dir}")
+        print(f"❌ Experiment directory not found: {experiment_dir}", file=out)
         return False
     
-    print(f"🧹 Cleaning experiment: {experiment_dir}")
+    print(f"🧹 Cleaning experiment: {experiment_dir}", file=out)
     
-    # Files to remove
-    cleanup_patterns = [
-        # LaTeX auxiliary files (can cause stale references)
-        "latex/*.aux",
-        "latex/*.bbl", 
-        "latex/*.blg",
-        "latex/*.log",
-        "latex/*.out",
-        "latex/*.fls",
-        "latex/*.fdb_latexmk",
-        "latex/*.synctex.gz",
-        
-        # Bibliography files (will be regenerated from cached_citations.bib)
-        "latex/references.bib",
-        
-        # Generated PDFs (will be regenerated with fixes)
-        "*.pdf",
-        
-        # Corrupted templates (will be regenerated)
-        "latex/template.tex",
-        
-        # Reflection artifacts (will be regenerated)
-        "*_reflection*_imgs",
-    ]
+    # Nothing has appeared since the last cleanup: skip the directory walks entirely
+    if _is_already_clean(experiment_dir, regenerate_citations):
+        print("✅ Already clean: nothing changed since the last cleanup", file=out)
+        return True
     
     # Optionally remove citation cache to force complete regeneration
-    if regenerate_citations:
-        cleanup_patterns.extend([
-            "cached_citations.bib",
-            "citations_progress.json",
-        ])
-    
-    # Directories to remove
-    cleanup_dirs = [
-        # Reflection image directories
-        "*_reflection*_imgs",
-    ]
+    match_top_level_file = (_TOP_LEVEL_FILE_WITH_CACHE_RE if regenerate_citations else _TOP_LEVEL_FILE_RE).match
     
     files_removed = 0
     dirs_removed = 0
+    # Verbose removal lines are collected and written out in one go
+    removal_log = []
     
-    # Remove files matching patterns
-    for pattern in cleanup_patterns:
-        full_pattern = os.path.join(experiment_dir, pattern)
-        matches = glob.glob(full_pattern)
-        for match in matches:
-            if os.path.isfile(match):
-                if verbose:
-                    print(f"  🗑️  Removing file: {os.path.relpath(match, experiment_dir)}")
-                os.remove(match)
-                files_removed += 1
+    # Remove generated files from latex/
+    for entry in _list_dir(os.path.join(experiment_dir, "latex")):
+        name = entry.name
+        if name.startswith('.'):
+            continue  # like glob's '*', never match hidden names
+        if _LATEX_FILE_RE.match(name) and entry.is_file():
+            if verbose:
+                removal_log.append(f"  🗑️  Removing file: {os.path.relpath(entry.path, experiment_dir)}\n")
+            os.remove(entry.path)
+            files_removed += 1
     
-    # Remove directories matching patterns
-    for pattern in cleanup_dirs:
-        full_pattern = os.path.join(experiment_dir, pattern)
-        matches = glob.glob(full_pattern)
-        for match in matches:
-            if os.path.isdir(match):
-                if verbose:
-                    print(f"  🗑️  Removing directory: {os.path.relpath(match, experiment_dir)}")
-                shutil.rmtree(match)
-                dirs_removed += 1
+    # Remove files and directories matching the top-level patterns
+    for entry in _list_dir(experiment_dir):
+        name = entry.name
+        if name.startswith('.'):
+            continue
+        if match_top_level_file(name) and entry.is_file():
+            if verbose:
+                removal_log.append(f"  🗑️  Removing file: {os.path.relpath(entry.path, experiment_dir)}\n")
+            os.remove(entry.path)
+            files_removed += 1
+        elif _DIR_RE.match(name) and entry.is_dir(follow_symlinks=False):
+            if verbose:
+                removal_log.append(f"  🗑️  Removing directory: {os.path.relpath(entry.path, experiment_dir)}\n")
+            _remove_tree(entry.path)
+            dirs_removed += 1
     
-    print(f"✅ Cleanup complete: {files_removed} files, {dirs_removed} directories removed")
+    if removal_log:
+        (out if out is not None else sys.stdout).write(''.join(removal_log))
+    print(f"✅ Cleanup complete: {files_removed} files, {dirs_removed} directories removed", file=out)
+    _record_cleanup(experiment_dir, regenerate_citations)
     
     if regenerate_citations:
-        print("🔄 Citation cache removed - citations will be completely regenerated")
+        print("🔄 Citation cache removed - citations will be completely regenerated", file=out)
     else:
-        print("💾 Citation cache preserved - references.bib will be regenerated from cached_citations.bib")
+        print("💾 Citation cache preserved - references.bib will be regenerated from cached_citations.bib", file=out)
     
     # Show what's preserved
     if verbose:
-        print(f"\n📋 Preserved important files:")
+        print(f"\n📋 Preserved important files:", file=out)
         preserved_items = [
             "idea.json", "idea.md",
             "figures/", "data/", "logs/",
@@ -101,25 +171,37 @@ def cleanup_experiment(experiment_dir, verbose=True, regenerate_citations=False)
         
         if not regenerate_citations:
             preserved_items.append("cached_citations.bib")  # Citations cache (references.bib will be regenerated from this)
+        
+        # One read of the experiment directory (and of latex/) answers every item
+        top_entries = {entry.name: entry for entry in _list_dir(experiment_dir)}
+        latex_entry = top_entries.get("latex")
+        latex_names = ([entry.name for entry in _list_dir(latex_entry.path) if not entry.name.startswith('.')]
+                       if latex_entry is not None and latex_entry.is_dir() else [])
+        
         for item in preserved_items:
-            full_path = os.path.join(experiment_dir, item)
-            if '*' in item:
-                matches = glob.glob(full_path)
-                if matches:
-                    print(f"  ✅ {item} ({len(matches)} files)")
-            elif os.path.exists(full_path):
-                print(f"  ✅ {item}")
+            if item.startswith("latex/*"):
+                suffix = item[len("latex/*"):]
+                count = sum(1 for name in latex_names if name.endswith(suffix))
+                if count:
+                    print(f"  ✅ {item} ({count} files)", file=out)
+            elif item.endswith('/'):
+                entry = top_entries.get(item[:-1])
+                if entry is not None and entry.is_dir():
+                    print(f"  ✅ {item}", file=out)
+            elif item in top_entries:
+                print(f"  ✅ {item}", file=out)
     
     return True
 
 def find_experiments():
     """Find all experiment directories"""
-    experiment_dirs = []
-    if os.path.exists("experiments"):
-        for item in os.listdir("experiments"):
-            item_path = os.path.join("experiments", item)
-            if os.path.isdir(item_path) and item.startswith("2025-"):
-                experiment_dirs.append(item_path)
+    try:
+        with os.scandir("experiments") as entries:
+            # The name test is free; is_dir() uses the cached dirent type
+            experiment_dirs = [entry.path for entry in entries
+                               if entry.name.startswith("2025-") and entry.is_dir()]
+    except FileNotFoundError:
+        return []
     return sorted(experiment_dirs)
 
 def main():
@@ -149,11 +231,21 @@ def main():
             return
         
         print(f"🧹 Cleaning {len(experiments)} experiment directories...")
+        
+        def clean(exp_dir):
+            # Buffer each experiment's report so concurrent cleanups don't interleave
+            out = io.StringIO()
+            ok = cleanup_experiment(exp_dir, verbose=not args.quiet, regenerate_citations=args.regenerate_citations, out=out)
+            return ok, out.getvalue()
+        
+        # Cleanup is unlink/rmtree bound: overlap the filesystem work across experiments
         success_count = 0
-        for exp_dir in experiments:
-            if cleanup_experiment(exp_dir, verbose=not args.quiet, regenerate_citations=args.regenerate_citations):
-                success_count += 1
-            print()  # Empty line between experiments
+        with ThreadPoolExecutor(max_workers=min(8, len(experiments))) as executor:
+            for ok, report in executor.map(clean, experiments):
+                sys.stdout.write(report)
+                if ok:
+                    success_count += 1
+                print()  # Empty line between experiments
         
         print(f"🎯 Summary: {success_count}/{len(experiments)} experiments cleaned successfully")
         
@@ -6,9 +6,60 @@ This script runs launch_scientist_bfts.py with detailed error capture
 to diagnose why the GPU allocation tests are failing.
 """
 
+import collections
+import os
+import re
 import subprocess
 import sys
 
+# Test command that failed in the GPU allocation test, run with this interpreter
+_DEBUG_CMD = (
+    sys.executable, "launch_scientist_bfts.py",
+    "--load_ideas", "ai_scientist/ideas/i_cant_believe_its_not_better.json",
+    "--idea_idx", "0",
+    "--writeup-type", "icbinb",
+    "--skip_writeup",
+    "--skip_review", 
+    "--attempt_id", "999",
+    "--force_cpu"
+)
+
+# Common error markers in the child's output, in order of precedence
+_ERROR_PATTERNS = [
+    ("ImportError", "Import/dependency issue"),
+    ("FileNotFoundError", "Missing file"),
+    ("ModuleNotFoundError", "Missing Python module"),
+    ("AttributeError", "Code compatibility issue"),
+    ("ValueError", "Invalid argument or configuration"),
+    ("TypeError", "Type mismatch"),
+    ("KeyError", "Missing configuration key"),
+    ("Traceback", "Python exception occurred")
+]
+_ERROR_PATTERN_RE = re.compile('|'.join(re.escape(pattern) for pattern, _ in _ERROR_PATTERNS))
+_ERROR_PATTERN_RANK = {pattern: (rank, description) for rank, (pattern, description) in enumerate(_ERROR_PATTERNS)}
+
+# Bytes requested per read of the child's output pipe
+_READ_CHUNK_SIZE = 65536
+
+# Only the most recent lines and the first few error lines are ever reported
+_TAIL_LINES = 10
+_MAX_REPORTED_ERRORS = 5
+
+def _capture_line(raw_line, output_tail, found_errors):
+    """Echo one line of child output into the tail, noting errors; a bare \\r splits lines as in text mode"""
+    for line in raw_line.decode("utf-8", errors="replace").rstrip().split("\r"):
+        line = line.rstrip()
+        print(line)
+        output_tail.append(line)
+        
+        # Look for common error patterns: one scan per line finds every marker,
+        # and the earliest-listed one describes the line
+        if len(found_errors) < _MAX_REPORTED_ERRORS:
+            markers = _ERROR_PATTERN_RE.findall(line)
+            if markers:
+                _, description = min(_ERROR_PATTERN_RANK[marker] for marker in markers)
+                found_errors.append(f"  • {description}: {line}")
+
 def debug_launch_scientist():
     """Debug launch_scientist_bfts.py execution with detailed error capture"""
     
@@ -16,16 +67,7 @@ def debug_launch_scientist():
     print("=" * 60)
     
     # Test command that failed in the GPU allocation test
-    cmd = [
-        "python", "launch_scientist_bfts.py",
-        "--load_ideas", "ai_scientist/ideas/i_cant_believe_its_not_better.json",
-        "--idea_idx", "0",
-        "--writeup-type", "icbinb",
-        "--skip_writeup",
-        "--skip_review", 
-        "--attempt_id", "999",
-        "--force_cpu"
-    ]
+    cmd = list(_DEBUG_CMD)
     
     print(f"🧪 Running command:")
     print(f"   {' '.join(cmd)}")
@@ -37,21 +79,26 @@ def debug_launch_scientist():
             cmd,
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
-            text=True,
-            bufsize=1,
-            universal_newlines=True
+            bufsize=0
         )
         
-        # Capture output line by line
-        output_lines = []
+        # Capture output in large chunks straight from the pipe, splitting lines ourselves;
+        # the pipe reaching EOF means the child closed its output. Errors are detected as
+        # lines arrive, so memory stays bounded however much the child prints
+        output_tail = collections.deque(maxlen=_TAIL_LINES)
+        found_errors = []
+        fd = process.stdout.fileno()
+        pending = b""
         while True:
-            line = process.stdout.readline()
-            if not line and process.poll() is not None:
+            chunk = os.read(fd, _READ_CHUNK_SIZE)
+            if not chunk:
                 break
-            if line:
-                line = line.rstrip()
-                print(line)
-                output_lines.append(line)
+            *lines, pending = (pending + chunk).split(b"\n")
+            for raw_line in lines:
+                _capture_line(raw_line, output_tail, found_errors)
+        if pending:
+            _capture_line(pending, output_tail, found_errors)
+        process.stdout.close()
         
         # Wait for process to complete
         return_code = process.wait()
@@ -63,33 +110,14 @@ def debug_launch_scientist():
             print("\n❌ FAILURE ANALYSIS:")
             print("-" * 40)
             
-            # Look for common error patterns
-            error_patterns = [
-                ("ImportError", "Import/dependency issue"),
-                ("FileNotFoundError", "Missing file"),
-                ("ModuleNotFoundError", "Missing Python module"),
-                ("AttributeError", "Code compatibility issue"),
-                ("ValueError", "Invalid argument or configuration"),
-                ("TypeError", "Type mismatch"),
-                ("KeyError", "Missing configuration key"),
-                ("Traceback", "Python exception occurred")
-            ]
-            
-            found_errors = []
-            for line in output_lines:
-                for pattern, description in error_patterns:
-                    if pattern in line:
-                        found_errors.append(f"  • {description}: {line}")
-                        break
-            
             if found_errors:
                 print("Detected error patterns:")
-                for error in found_errors[:5]:  # Show first 5 errors
+                for error in found_errors:  # First 5 errors
                     print(error)
             else:
                 print("No obvious error patterns detected in output.")
                 print("Last 10 lines of output:")
-                for line in output_lines[-10:]:
+                for line in output_tail:
                     print(f"  {line}")
         else:
             print("✅ Process completed successfully!")
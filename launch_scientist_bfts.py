@@ -2,15 +2,18 @@ import os.path as osp
 import json
 import argparse
 import shutil
-import torch
+import subprocess
+import psutil
 import os
-import re
 import sys
+import atexit
 import signal
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from ai_scientist.llm import create_client
 
-from contextlib import contextmanager
 from ai_scientist.treesearch.perform_experiments_bfts_with_agentmanager import (
     perform_experiments_bfts,
 )
@@ -23,6 +26,7 @@ from ai_scientist.perform_writeup import perform_writeup
 from ai_scientist.perform_icbinb_writeup import (
     perform_writeup as perform_icbinb_writeup,
     gather_citations,
+    gather_citations_batched,
 )
 
 # Import LaTeX validation system
@@ -35,6 +39,20 @@ except ImportError:
 from ai_scientist.perform_llm_review import perform_review, load_paper
 from ai_scientist.perform_vlm_review import perform_imgs_cap_ref_review
 from ai_scientist.utils.token_tracker import token_tracker
+from ai_scientist.utils.pdf_selection import find_pdf_path_for_review
+from ai_scientist.utils.mps import ensure_mps_daemon, stop_mps_daemon
+
+# Optional NVML bindings, used to inspect GPUs without creating a CUDA context
+try:
+    import pynvml
+except ImportError:
+    pynvml = None
+
+# Optional faster JSON parser/serializer for idea banks and the token tracker dumps
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 
 def print_time():
@@ -45,7 +63,6 @@ def cleanup_processes():
     """Clean up all child processes"""
     print("Start cleaning up processes")
     try:
-        import psutil
         # Get the current process and all its children
         current_process = psutil.Process()
         children = current_process.children(recursive=True)
@@ -79,11 +96,39 @@ def signal_handler(signum, frame):
     sys.exit(1)
 
 
+def load_ideas(path):
+    """Parse an idea bank, with orjson's C parser when it is installed"""
+    if orjson is not None:
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+# Interactions recorded per model at the last save; the tracker only ever grows,
+# so unchanged counts mean the files on disk are already current
+_token_tracker_saved_counts = None
+
+
+def _dump_json_compact(obj, path):
+    """Write obj as whitespace-free JSON, through orjson when it is installed"""
+    if orjson is not None:
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(obj))
+    else:
+        with open(path, "w", buffering=1 << 20) as f:
+            json.dump(obj, f, separators=(",", ":"))
+
+
 def save_token_tracker(idea_dir):
-    with open(osp.join(idea_dir, "token_tracker.json"), "w") as f:
-        json.dump(token_tracker.get_summary(), f)
-    with open(osp.join(idea_dir, "token_tracker_interactions.json"), "w") as f:
-        json.dump(token_tracker.get_interactions(), f)
+    global _token_tracker_saved_counts
+    interactions = token_tracker.get_interactions()
+    counts = {model: len(entries) for model, entries in interactions.items()}
+    if counts == _token_tracker_saved_counts:
+        return
+    _dump_json_compact(token_tracker.get_summary(), osp.join(idea_dir, "token_tracker.json"))
+    _dump_json_compact(interactions, osp.join(idea_dir, "token_tracker_interactions.json"))
+    _token_tracker_saved_counts = counts
 
 
 def parse_arguments():
@@ -159,6 +204,11 @@ def parse_arguments():
         default="gpt-4o-2024-11-20",
         help="Model to use for review main text and captions",
     )
+    parser.add_argument(
+        "--use_batch_api",
+        action="store_true",
+        help="Gather citations with two OpenAI Batch API jobs instead of sequential rounds (cheaper, but batches may take longer)",
+    )
     parser.add_argument(
         "--skip_writeup",
         action="store_true",
@@ -185,10 +235,60 @@ def parse_arguments():
         action="store_true",
         help="Disable LaTeX validation and auto-fixing features",
     )
-    return parser.parse_args()
-
-
-def validate_gpu_setup():
+    parser.add_argument(
+        "--keep_experiment_results",
+        action="store_true",
+        help="Leave experiment results in idea_dir/experiment_results after plot aggregation (for debugging)",
+    )
+    parser.add_argument(
+        "--torch_probe",
+        action="store_true",
+        help="Also report GPUs as seen by PyTorch during GPU validation (creates a CUDA context in the launcher)",
+    )
+    parser.add_argument(
+        "--mps_percent",
+        type=int,
+        default=None,
+        help="Share of each GPU's SMs (1-100) for this run under NVIDIA MPS, so several runs can share a GPU",
+    )
+    args = parser.parse_args()
+    if args.mps_percent is not None and not 0 < args.mps_percent <= 100:
+        parser.error("--mps_percent must be between 1 and 100")
+    return args
+
+
+# (index, name, memory.total) of each GPU, from the first successful nvidia-smi query
+_gpu_query_cache = None
+# A missing nvidia-smi is remembered for a while instead of being looked up on every call
+_GPU_QUERY_RETRY_SECONDS = 60
+_gpu_query_missing = None  # (monotonic time, FileNotFoundError) of the last failed lookup
+
+
+def _query_nvidia_smi():
+    """List GPUs with a single nvidia-smi call, shared by validate_gpu_setup and get_available_gpus"""
+    global _gpu_query_cache, _gpu_query_missing
+    if _gpu_query_cache is None:
+        if _gpu_query_missing is not None:
+            failed_at, error = _gpu_query_missing
+            if time.monotonic() - failed_at < _GPU_QUERY_RETRY_SECONDS:
+                raise error
+        try:
+            result = subprocess.run(
+                ["nvidia-smi", "--query-gpu=index,name,memory.total", "--format=csv,noheader"],
+                capture_output=True, text=True, check=True, timeout=5
+            )
+        except FileNotFoundError as e:
+            _gpu_query_missing = (time.monotonic(), e)
+            raise
+        _gpu_query_cache = [
+            tuple(field.strip() for field in line.split(",", 2))
+            for line in result.stdout.splitlines()
+            if line.strip()
+        ]
+    return _gpu_query_cache
+
+
+def validate_gpu_setup(torch_probe=False):
     """Validate GPU setup and provide detailed information"""
     print("\n🔍 GPU Setup Validation:")
     print("-" * 40)
@@ -199,33 +299,50 @@ def validate_gpu_setup():
     
     # Check nvidia-smi
     try:
-        import subprocess
-        result = subprocess.run(
-            ["nvidia-smi", "--query-gpu=index,name,memory.total", "--format=csv,noheader"],
-            capture_output=True, text=True, check=True
-        )
+        gpus = _query_nvidia_smi()
         print("nvidia-smi GPUs:")
-        for line in result.stdout.strip().split("\n"):
-            if line.strip():
-                print(f"  {line}")
+        for gpu in gpus:
+            print(f"  {', '.join(gpu)}")
     except Exception as e:
         print(f"nvidia-smi error: {e}")
     
-    # Check torch CUDA
-    try:
-        torch_available = torch.cuda.is_available()
-        torch_count = torch.cuda.device_count()
-        print(f"PyTorch CUDA available: {torch_available}")
-        print(f"PyTorch GPU count: {torch_count}")
-        if torch_count > 0:
-            for i in range(torch_count):
-                try:
-                    name = torch.cuda.get_device_name(i)
+    # Check the driver through NVML: unlike torch.cuda it creates no CUDA context,
+    # so the launcher holds no device memory its experiment processes could use
+    if pynvml is not None:
+        try:
+            pynvml.nvmlInit()
+            try:
+                handles = [pynvml.nvmlDeviceGetHandleByIndex(i) for i in range(pynvml.nvmlDeviceGetCount())]
+                print(f"NVML GPU count: {len(handles)}")
+                for i, handle in enumerate(handles):
+                    name = pynvml.nvmlDeviceGetName(handle)
+                    if isinstance(name, bytes):
+                        name = name.decode("utf-8", "replace")
                     print(f"  GPU {i}: {name}")
-                except:
-                    print(f"  GPU {i}: <name unavailable>")
-    except Exception as e:
-        print(f"PyTorch CUDA error: {e}")
+            finally:
+                pynvml.nvmlShutdown()
+        except Exception as e:
+            print(f"NVML error: {e}")
+    else:
+        print("NVML: pynvml not installed")
+    
+    # Check torch CUDA (opt-in: initializing CUDA here costs seconds and device memory)
+    if torch_probe:
+        try:
+            import torch
+            torch_available = torch.cuda.is_available()
+            torch_count = torch.cuda.device_count()
+            print(f"PyTorch CUDA available: {torch_available}")
+            print(f"PyTorch GPU count: {torch_count}")
+            if torch_count > 0:
+                for i in range(torch_count):
+                    try:
+                        name = torch.cuda.get_device_name(i)
+                        print(f"  GPU {i}: {name}")
+                    except:
+                        print(f"  GPU {i}: <name unavailable>")
+        except Exception as e:
+            print(f"PyTorch CUDA error: {e}")
     
     print("-" * 40)
 
@@ -236,21 +353,13 @@ def get_available_gpus(gpu_ids=None):
         return [int(gpu_id) for gpu_id in gpu_ids.split(",")]
     
     # Use the same detection method as parallel_agent.py
-    import subprocess
     try:
-        # First try using nvidia-smi (same as BFTS)
-        nvidia_smi = subprocess.run(
-            ["nvidia-smi", "--query-gpu=gpu_name", "--format=csv,noheader"],
-            capture_output=True,
-            text=True,
-            check=True,
-        )
-        gpus = nvidia_smi.stdout.strip().split("\n")
-        gpu_count = len(gpus)
-        return list(range(gpu_count))
+        # First try using nvidia-smi (same as BFTS); validate_gpu_setup already ran the query
+        return list(range(len(_query_nvidia_smi())))
     except (subprocess.SubprocessError, FileNotFoundError):
         # Fallback to torch method
         try:
+            import torch
             return list(range(torch.cuda.device_count()))
         except:
             # Final fallback to environment variable
@@ -261,60 +370,15 @@ def get_available_gpus(gpu_ids=None):
             return []
 
 
-def find_pdf_path_for_review(idea_dir):
-    pdf_files = [f for f in os.listdir(idea_dir) if f.endswith(".pdf")]
-    reflection_pdfs = [f for f in pdf_files if "reflection" in f]
-    pdf_path = None
-    
-    if reflection_pdfs:
-        # First check if there's a final version
-        final_pdfs = [f for f in reflection_pdfs if "final" in f.lower()]
-        if final_pdfs:
-            # Use the final version if available
-            pdf_path = osp.join(idea_dir, final_pdfs[0])
-        else:
-            # Try to find numbered reflections
-            reflection_nums = []
-            for f in reflection_pdfs:
-                match = re.search(r"reflection[_.]?(\d+)", f)
-                if match:
-                    reflection_nums.append((int(match.group(1)), f))
-
-            if reflection_nums:
-                # Get the file with the highest reflection number
-                highest_reflection = max(reflection_nums, key=lambda x: x[0])
-                pdf_path = osp.join(idea_dir, highest_reflection[1])
-            else:
-                # Fall back to the first reflection PDF if no numbers found
-                pdf_path = osp.join(idea_dir, reflection_pdfs[0])
-    elif pdf_files:
-        # If no reflection PDFs, use any available PDF
-        pdf_path = osp.join(idea_dir, pdf_files[0])
-    
-    return pdf_path
-
-
-@contextmanager
-def redirect_stdout_stderr_to_file(log_file_path):
-    original_stdout = sys.stdout
-    original_stderr = sys.stderr
-    log = open(log_file_path, "a")
-    sys.stdout = log
-    sys.stderr = log
-    try:
-        yield
-    finally:
-        sys.stdout = original_stdout
-        sys.stderr = original_stderr
-        log.close()
-
-
 if __name__ == "__main__":
     # Set up signal handlers for graceful shutdown
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
     
     args = parse_arguments()
+    # LaTeXPackageManager reports its progress at INFO
+    logging.basicConfig(format="%(message)s", stream=sys.stdout)
+    logging.getLogger("ai_scientist.utils.latex_helper").setLevel(logging.INFO)
     os.environ["AI_SCIENTIST_ROOT"] = os.path.dirname(os.path.abspath(__file__))
     print(f"Set AI_SCIENTIST_ROOT to {os.environ['AI_SCIENTIST_ROOT']}")
 
@@ -328,8 +392,22 @@ if __name__ == "__main__":
         reason = "disabled by --disable_latex_validation" if args.disable_latex_validation else "not available"
         print(f"⚠️  LaTeX validation system: DISABLED ({reason})")
 
-    # Validate GPU setup before proceeding
-    validate_gpu_setup()
+    # Share the GPUs with other runs through MPS; the limit must be in the environment
+    # before this process or any of its children creates a CUDA context
+    mps_percent = None
+    if args.mps_percent is not None and not args.force_cpu:
+        if ensure_mps_daemon():
+            # Quits the daemon on exit only if this run was the one that started it
+            atexit.register(stop_mps_daemon)
+            mps_percent = args.mps_percent
+            os.environ["CUDA_MPS_ACTIVE_THREAD_PERCENTAGE"] = str(mps_percent)
+            print(f"🎮 MPS active thread percentage: {args.mps_percent}%")
+
+    # Validate GPU setup before proceeding, unless GPUs are switched off anyway
+    if args.force_cpu or os.environ.get("CUDA_VISIBLE_DEVICES") == "":
+        print("🖥️  GPUs disabled - skipping GPU setup validation")
+    else:
+        validate_gpu_setup(torch_probe=args.torch_probe)
 
     # Check available GPUs and configure GPU usage
     if args.force_cpu:
@@ -346,9 +424,8 @@ if __name__ == "__main__":
             print("🖥️  No GPUs detected - falling back to CPU mode")
             os.environ["CUDA_VISIBLE_DEVICES"] = ""
 
-    with open(args.load_ideas, "r") as f:
-        ideas = json.load(f)
-        print(f"Loaded {len(ideas)} pregenerated ideas from {args.load_ideas}")
+    ideas = load_ideas(args.load_ideas)
+    print(f"Loaded {len(ideas)} pregenerated ideas from {args.load_ideas}")
 
     idea = ideas[args.idea_idx]
 
@@ -410,7 +487,8 @@ if __name__ == "__main__":
     gpu_info = {
         "available_gpus": available_gpus,
         "force_cpu": args.force_cpu,
-        "cuda_visible_devices": os.environ.get("CUDA_VISIBLE_DEVICES", "")
+        "cuda_visible_devices": os.environ.get("CUDA_VISIBLE_DEVICES", ""),
+        "mps_percent": mps_percent if available_gpus else None,
     }
     
     idea_config_path = edit_bfts_config_file(
@@ -422,26 +500,58 @@ if __name__ == "__main__":
 
     perform_experiments_bfts(idea_config_path)
     experiment_results_dir = osp.join(idea_dir, "logs/0-run/experiment_results")
+    aggregation_results_dir = osp.join(idea_dir, "experiment_results")
+    results_moved = False
     if os.path.exists(experiment_results_dir):
-        shutil.copytree(
-            experiment_results_dir,
-            osp.join(idea_dir, "experiment_results"),
-            dirs_exist_ok=True,
-        )
+        # Both directories live under idea_dir, so a rename normally suffices; copy across
+        # devices, when an earlier run left the destination behind, or when the results are
+        # kept. A hard kill before the move back below leaves the results only in
+        # idea_dir/experiment_results; with --keep_experiment_results logs/ never loses them
+        if not args.keep_experiment_results:
+            try:
+                os.replace(experiment_results_dir, aggregation_results_dir)
+                results_moved = True
+            except OSError:
+                pass
+        if not results_moved:
+            shutil.copytree(
+                experiment_results_dir,
+                aggregation_results_dir,
+                dirs_exist_ok=True,
+            )
 
-    aggregate_plots(base_folder=idea_dir, model=args.model_agg_plots)
+    # Citation gathering only reads the idea and experiment summaries, like plot aggregation:
+    # run the two LLM-bound steps side by side. Leaving the block joins the citation thread,
+    # so nothing else touches the token tracker once it is saved below
+    citations_text = None
+    try:
+        with ThreadPoolExecutor(max_workers=1) as citation_executor:
+            citations_future = None
+            if not args.skip_writeup:
+                citations_future = citation_executor.submit(
+                    gather_citations_batched if args.use_batch_api else gather_citations,
+                    idea_dir,
+                    num_cite_rounds=args.num_cite_rounds,
+                    small_model=args.model_citation,
+                )
 
-    shutil.rmtree(osp.join(idea_dir, "experiment_results"))
+            aggregate_plots(base_folder=idea_dir, model=args.model_agg_plots)
+            if citations_future is not None:
+                citations_text = citations_future.result()
+    finally:
+        # Even when aggregation or citation gathering raised
+        if args.keep_experiment_results:
+            print(f"Keeping a copy of the experiment results in {aggregation_results_dir}")
+        elif results_moved:
+            # Hand the results back to the tree search logs they were taken from
+            os.replace(aggregation_results_dir, experiment_results_dir)
+        else:
+            shutil.rmtree(aggregation_results_dir)
 
     save_token_tracker(idea_dir)
 
     if not args.skip_writeup:
         writeup_success = False
-        citations_text = gather_citations(
-            idea_dir,
-            num_cite_rounds=args.num_cite_rounds,
-            small_model=args.model_citation,
-        )
         
         # Fix bibliography reference to prevent citation issues
         latex_file = osp.join(idea_dir, "latex", "template.tex")
@@ -542,10 +652,14 @@ if __name__ == "__main__":
             print("Paper found at: ", pdf_path)
             paper_content = load_paper(pdf_path)
             client, client_model = create_client(args.model_review)
-            review_text = perform_review(paper_content, client_model, client)
-            review_img_cap_ref = perform_imgs_cap_ref_review(
-                client, client_model, pdf_path
-            )
+            # The text review and the figure/caption review are independent LLM calls
+            with ThreadPoolExecutor(max_workers=2) as review_executor:
+                review_future = review_executor.submit(perform_review, paper_content, client_model, client)
+                img_cap_ref_future = review_executor.submit(
+                    perform_imgs_cap_ref_review, client, client_model, pdf_path
+                )
+                review_text = review_future.result()
+                review_img_cap_ref = img_cap_ref_future.result()
             with open(osp.join(idea_dir, "review_text.txt"), "w") as f:
                 f.write(json.dumps(review_text, indent=4))
             with open(osp.join(idea_dir, "review_img_cap_ref.json"), "w") as f:
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Run several launch_scientist_bfts.py workers side by side on shared GPUs
+
+Each idea gets its own worker process; NVIDIA MPS splits every GPU's SMs
+between them, with the per-worker percentages summing to 100.
+Arguments not listed below are passed through to every worker.
+"""
+
+import argparse
+import os
+import signal
+import subprocess
+import sys
+
+from ai_scientist.utils.mps import ensure_mps_daemon, stop_mps_daemon
+
+
+def split_percentages(num_workers):
+    """Split 100% of the SMs between num_workers workers, earlier workers taking the remainder"""
+    share, remainder = divmod(100, num_workers)
+    return [share + (1 if i < remainder else 0) for i in range(num_workers)]
+
+
+def terminate_workers(workers, timeout=10):
+    """SIGTERM each worker's session (the worker and everything it started), then SIGKILL stragglers"""
+    for sig in (signal.SIGTERM, signal.SIGKILL):
+        for _, process in workers:
+            if process.poll() is None:
+                try:
+                    os.killpg(process.pid, sig)
+                except ProcessLookupError:
+                    pass
+        for _, process in workers:
+            try:
+                process.wait(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                continue
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run AI Scientist workers for several ideas on shared GPUs via MPS")
+    parser.add_argument(
+        "--idea_idxs",
+        type=str,
+        required=True,
+        help="Comma-separated list of idea indices to run concurrently (e.g., '0,1,2')",
+    )
+    parser.add_argument(
+        "--log_dir",
+        type=str,
+        default="logs/mps_workers",
+        help="Directory for each worker's combined stdout/stderr",
+    )
+    args, worker_args = parser.parse_known_args()
+
+    idea_idxs = [int(idx) for idx in args.idea_idxs.split(",")]
+    if len(idea_idxs) > 100:
+        parser.error("at most 100 workers can share a GPU")
+    percentages = split_percentages(len(idea_idxs))
+    os.makedirs(args.log_dir, exist_ok=True)
+
+    # Start the daemon here rather than in a worker, so it outlives every worker using it
+    ensure_mps_daemon()
+    try:
+        return run_workers(args, worker_args, idea_idxs, percentages)
+    finally:
+        stop_mps_daemon()
+
+
+def run_workers(args, worker_args, idea_idxs, percentages):
+    """Run one worker per idea and wait for all of them; returns the exit status"""
+    launcher = os.path.join(os.path.dirname(os.path.abspath(__file__)), "launch_scientist_bfts.py")
+    workers = []
+
+    # The workers are outside the terminal's foreground group: forward Ctrl-C and SIGTERM
+    def stop_workers(signum, frame):
+        print(f"\n🛑 Received signal {signum}. Stopping workers...")
+        terminate_workers(workers)
+        sys.exit(1)
+
+    signal.signal(signal.SIGINT, stop_workers)
+    signal.signal(signal.SIGTERM, stop_workers)
+
+    for idea_idx, percent in zip(idea_idxs, percentages):
+        cmd = [sys.executable, launcher, *worker_args, "--idea_idx", str(idea_idx), "--mps_percent", str(percent)]
+        log_path = os.path.join(args.log_dir, f"idea_{idea_idx}.log")
+        print(f"🚀 Idea {idea_idx}: {percent}% of each GPU, logging to {log_path}")
+        with open(log_path, "a") as log:
+            # Each worker leads its own session, so one killpg reaches its whole process tree
+            workers.append((idea_idx, subprocess.Popen(cmd, stdout=log, stderr=subprocess.STDOUT,
+                                                       start_new_session=True)))
+
+    failed = 0
+    for idea_idx, process in workers:
+        return_code = process.wait()
+        if return_code == 0:
+            print(f"✅ Idea {idea_idx} finished")
+        else:
+            print(f"❌ Idea {idea_idx} exited with return code {return_code}")
+            failed += 1
+
+    print(f"🎯 Summary: {len(workers) - failed}/{len(workers)} workers succeeded")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,52 +2,30 @@
 
 import os
 import sys
-import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+from ai_scientist.utils.tex_env import pdflatex_path, prepend_to_path, tinytex_prefix
 
 # Add TinyTeX to PATH before importing anything else
-tinytex_path = os.path.expanduser("~/Library/TinyTeX/bin/universal-darwin")
-if os.path.exists(tinytex_path):
-    os.environ['PATH'] = f"{tinytex_path}:{os.environ.get('PATH', '')}"
+tinytex_path = tinytex_prefix()
+if tinytex_path:
+    prepend_to_path(tinytex_path)
 
 from ai_scientist.perform_icbinb_writeup import perform_writeup, gather_citations
 from ai_scientist.perform_llm_review import perform_review, load_paper
 from ai_scientist.perform_vlm_review import perform_imgs_cap_ref_review
 from ai_scientist.llm import create_client
+from ai_scientist.utils.pdf_selection import find_pdf_path_for_review
 import json
 import os.path as osp
 import re
 
-def find_pdf_path_for_review(idea_dir):
-    """Find the most recent PDF file for review"""
-    pdf_files = [f for f in os.listdir(idea_dir) if f.endswith(".pdf")]
-    reflection_pdfs = [f for f in pdf_files if "reflection" in f]
-    pdf_path = None
-    
-    if reflection_pdfs:
-        # First check if there's a final version
-        final_pdfs = [f for f in reflection_pdfs if "final" in f.lower()]
-        if final_pdfs:
-            pdf_path = osp.join(idea_dir, final_pdfs[0])
-        else:
-            # Try to find numbered reflections
-            reflection_nums = []
-            for f in reflection_pdfs:
-                match = re.search(r"reflection[_.]?(\d+)", f)
-                if match:
-                    reflection_nums.append((int(match.group(1)), f))
-
-            if reflection_nums:
-                # Get the file with the highest reflection number
-                highest_reflection = max(reflection_nums, key=lambda x: x[0])
-                pdf_path = osp.join(idea_dir, highest_reflection[1])
-            else:
-                # Fall back to the first reflection PDF if no numbers found
-                pdf_path = osp.join(idea_dir, reflection_pdfs[0])
-    elif pdf_files:
-        # If no reflection PDFs, use any available PDF
-        pdf_path = osp.join(idea_dir, pdf_files[0])
-    
-    return pdf_path
+# Patterns for the template fixes applied when resuming
+_BIBLIOGRAPHY_RE = re.compile(r'\\bibliography\{iclr2025\}')
+_AMSMATH_RE = re.compile(r'\\usepackage\{amsmath\}')
+_DOCUMENTCLASS_RE = re.compile(r'\\documentclass\{article\}')
+# A whole line starting with \usepackage
+_USEPACKAGE_LINE_RE = re.compile(r'^[ \t]*\\usepackage[^\n]*', re.MULTILINE)
 
 def restore_corrupted_template(latex_dir, base_template_dir):
     """Restore the corrupted template.tex from the base template"""
@@ -102,12 +80,12 @@ def main():
         sys.exit(1)
     
     print(f"🎯 Resuming experiment: {experiment_dir}")
-    print(f"🔧 Using pdflatex from: {tinytex_path}")
+    print(f"🔧 Using pdflatex from: {tinytex_path or 'PATH'}")
     
     # Check if pdflatex is available
-    pdflatex_path = shutil.which('pdflatex')
-    if pdflatex_path:
-        print(f"✅ pdflatex found at: {pdflatex_path}")
+    pdflatex = pdflatex_path()
+    if pdflatex:
+        print(f"✅ pdflatex found at: {pdflatex}")
     else:
         print("❌ pdflatex not found in PATH!")
         sys.exit(1)
@@ -164,8 +142,8 @@ def main():
         fixes_applied = []
         
         # Fix bibliography reference
-        if '\\bibliography{iclr2025}' in content:
-            content = content.replace('\\bibliography{iclr2025}', '\\bibliography{references}')
+        content, count = _BIBLIOGRAPHY_RE.subn(r'\\bibliography{references}', content)
+        if count:
             fixes_applied.append("bibliography reference")
         
         # Fix missing style file references
@@ -173,27 +151,22 @@ def main():
             content = content.replace('\\usepackage{iclr2025_conference}', '\\usepackage{iclr2025}')
             fixes_applied.append("conference style file")
         
-        # Ensure siunitx package is present
+        # Ensure siunitx package is present, after amsmath or else after the document class
         if '\\usepackage{siunitx}' not in content:
-            # Find the best place to insert siunitx
-            if '\\usepackage{amsmath}' in content:
-                content = content.replace('\\usepackage{amsmath}', '\\usepackage{amsmath}\n\\usepackage{siunitx}')
-                fixes_applied.append("siunitx package")
-            elif '\\documentclass{article}' in content:
-                content = content.replace('\\documentclass{article}', '\\documentclass{article}\n\\usepackage{siunitx}')
-                fixes_applied.append("siunitx package")
+            for anchor_re in (_AMSMATH_RE, _DOCUMENTCLASS_RE):
+                content, count = anchor_re.subn(r'\g<0>\n\\usepackage{siunitx}', content, count=1)
+                if count:
+                    fixes_applied.append("siunitx package")
+                    break
         
-        # Add missing caption package if needed
+        # Add missing caption package if needed, right after the last usepackage line
         if '\\captionof' in content and '\\usepackage{caption}' not in content:
-            # Find last usepackage line and insert after it
-            lines = content.split('\n')
-            last_usepackage_idx = -1
-            for i, line in enumerate(lines):
-                if line.strip().startswith('\\usepackage'):
-                    last_usepackage_idx = i
-            if last_usepackage_idx >= 0:
-                lines.insert(last_usepackage_idx + 1, '\\usepackage{caption}')
-                content = '\n'.join(lines)
+            last_usepackage = None
+            for last_usepackage in _USEPACKAGE_LINE_RE.finditer(content):
+                pass
+            if last_usepackage is not None:
+                end = last_usepackage.end()
+                content = content[:end] + '\n\\usepackage{caption}' + content[end:]
                 fixes_applied.append("caption package")
         
         if fixes_applied:
@@ -234,10 +207,14 @@ def main():
                     print(f"📄 Reviewing paper at: {pdf_path}")
                     paper_content = load_paper(pdf_path)
                     client, client_model = create_client("gpt-4o-2024-11-20")
-                    review_text = perform_review(paper_content, client_model, client)
-                    review_img_cap_ref = perform_imgs_cap_ref_review(
-                        client, client_model, pdf_path
-                    )
+                    # The text review and the figure/caption review are independent LLM calls
+                    with ThreadPoolExecutor(max_workers=2) as review_executor:
+                        review_future = review_executor.submit(perform_review, paper_content, client_model, client)
+                        img_cap_ref_future = review_executor.submit(
+                            perform_imgs_cap_ref_review, client, client_model, pdf_path
+                        )
+                        review_text = review_future.result()
+                        review_img_cap_ref = img_cap_ref_future.result()
                     with open(osp.join(experiment_dir, "review_text.txt"), "w") as f:
                         f.write(json.dumps(review_text, indent=4))
                     with open(osp.join(experiment_dir, "review_img_cap_ref.json"), "w") as f: